@@ -1,26 +1,35 @@
+import contextlib
+from functools import lru_cache
+
 from playwright.async_api import BrowserContext, Page
 from pyotp import TOTP
 
+from ..automation.constants import SIGN_IN_SELECTORS
+from ..automation.ui import any_visible
 from ..utils.config import get_settings
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+@lru_cache(maxsize=8)
+def _totp(secret: str) -> TOTP:
+    """Return a TOTP generator for ``secret``, reused across logins."""
+    return TOTP(secret)
+
+
 async def _click_sign_in_if_present(page: Page) -> None:
-    for locator in (
-        'role=link[name="Sign in"]',
-        'role=button[name="Sign in"]',
-        "text=Sign in",
-        'a:has-text("Sign in")',
-        'button:has-text("Sign in")',
-    ):
-        try:
-            if await page.is_visible(locator, timeout=2000):
-                await page.click(locator)
-                return
-        except Exception:
-            continue
+    with contextlib.suppress(Exception):
+        await any_visible(page, SIGN_IN_SELECTORS).first.click(timeout=2000)
+
+
+async def _click_first(page: Page, selectors: tuple[str, ...], timeout: int = 5000) -> bool:
+    """Click the first visible element matching any selector, in a single locator query."""
+    try:
+        await any_visible(page, selectors).first.click(timeout=timeout)
+    except Exception:
+        return False
+    return True
 
 
 async def _login_via_live(page: Page, username: str, password: str) -> bool:
@@ -46,10 +55,13 @@ async def _login_via_live(page: Page, username: str, password: str) -> bool:
 
 
 async def _login_via_generic(
-    page: Page, username: str, password: str, mfa_secret: str | None
+    page: Page,
+    username: str,
+    password: str,
+    mfa_secret: str | None,
+    copilot_url: str | None = None,
 ) -> bool:
-    settings = get_settings()
-    await page.goto(settings.copilot_url)
+    await page.goto(copilot_url or get_settings().copilot_url)
     await _click_sign_in_if_present(page)
     try:
         await page.wait_for_selector(
@@ -59,38 +71,35 @@ async def _login_via_generic(
             await page.fill("#i0116", username)
         else:
             await page.fill('input[type="email"], input[name="loginfmt"]', username)
-        for submit in (
-            "#idSIButton9",
-            'input[type="submit"]',
-            'button[type="submit"]',
-            'input[value="Next"]',
-            'button:has-text("Next")',
-        ):
-            if await page.is_visible(submit):
-                await page.click(submit)
-                break
+        await _click_first(
+            page,
+            (
+                "#idSIButton9",
+                'input[type="submit"]',
+                'button[type="submit"]',
+                'input[value="Next"]',
+                'button:has-text("Next")',
+            ),
+        )
         await page.wait_for_selector('input[type="password"], #i0118', timeout=45000)
         if await page.is_visible("#i0118"):
             await page.fill("#i0118", password)
         else:
             await page.fill('input[type="password"]', password)
-        for submit in (
-            "#idSIButton9",
-            'input[type="submit"]',
-            'button[type="submit"]',
-            'button:has-text("Sign in")',
-            'input[value="Sign in"]',
-        ):
-            if await page.is_visible(submit):
-                await page.click(submit)
-                break
+        await _click_first(
+            page,
+            (
+                "#idSIButton9",
+                'input[type="submit"]',
+                'button[type="submit"]',
+                'button:has-text("Sign in")',
+                'input[value="Sign in"]',
+            ),
+        )
         if mfa_secret and await page.is_visible('input[name="otc"]', timeout=5000):
-            otp = TOTP(mfa_secret).now()
+            otp = _totp(mfa_secret).now()
             await page.fill('input[name="otc"]', otp)
-            for submit in ('input[type="submit"]', 'button[type="submit"]'):
-                if await page.is_visible(submit):
-                    await page.click(submit)
-                    break
+            await _click_first(page, ('input[type="submit"]', 'button[type="submit"]'))
         await page.wait_for_load_state("networkidle")
         return True
     except Exception:
@@ -106,7 +115,9 @@ async def perform_login(
 
     ok = await _login_via_live(page, username, password)
     if not ok:
-        ok = await _login_via_generic(page, username, password, mfa_secret)
+        ok = await _login_via_generic(
+            page, username, password, mfa_secret, copilot_url=settings.copilot_url
+        )
 
     if not ok:
         await page.close()
@@ -114,7 +125,6 @@ async def perform_login(
 
     # Navigate to Copilot and persist state
     await page.goto(settings.copilot_url)
-    await page.wait_for_load_state("networkidle")
     await context.storage_state(path=str(settings.storage_state_path))
     logger.info("Stored authentication state at %s", settings.storage_state_path)
 
@@ -1,87 +1,147 @@
+import asyncio
+import contextlib
 import re
+from collections.abc import Iterator
 from html import unescape
+from itertools import islice
 
-from playwright.async_api import Page
+from playwright.async_api import Locator, Page, Request
 
 from .constants import (
+    BULLET_LINE_PATTERN,
     CITATION_PATTERN,
-    MESSAGE_SELECTORS,
+    COPILOT_SAID_PATTERN,
+    EDIT_IN_PAGE_PATTERN,
+    EXCESS_NEWLINES_PATTERN,
+    HEADING_PATTERN,
+    HORIZONTAL_RULE_PATTERN,
+    INLINE_BULLET_PATTERN,
+    INLINE_NUMBERED_PATTERN,
+    LINE_PATTERN,
+    MESSAGE_SELECTOR_UNION,
     NETWORK_IDLE_TIMEOUT_MS,
-    NOISY_PHRASES,
+    NOISY_PHRASES_PATTERN,
+    POLL_INTERVAL_MIN_MS,
     POLL_INTERVAL_MS,
+    PROMPT_INPUT_SELECTOR,
+    RAW_MARKDOWN_SELECTOR_UNION,
     RAW_MARKDOWN_SELECTORS,
+    RESPONSE_STABLE_MS,
+    RESPONSE_STREAM_URL_PATTERN,
+    RULE_HEADING_PATTERN,
+    SELECTOR_WAIT_MS,
+    SEND_BUTTON_SELECTORS,
     STATUS_PREFIXES,
+    STOP_BUTTON_SELECTORS,
 )
+from .ui import any_visible
 
 
 async def send_prompt(page: Page, prompt: str) -> None:
-    await page.fill('textarea, [role="textbox"]', prompt)
-    for selector in (
-        'button[aria-label="Send"]',
-        'button[data-testid="send-button"]',
-        'button[type="submit"]',
-    ):
-        if await page.is_visible(selector):
-            await page.click(selector)
-            return
-    await page.keyboard.press("Enter")
-
-
-async def _collect_texts(page: Page, selector: str) -> list[str]:
-    texts: list[str] = []
-    loc = page.locator(selector)
+    await page.fill(PROMPT_INPUT_SELECTOR, prompt)
+    send_button = any_visible(page, SEND_BUTTON_SELECTORS).first
     try:
-        count = await loc.count()
+        await send_button.click(timeout=SELECTOR_WAIT_MS)
     except Exception:
-        count = 0
-    for i in range(max(0, count - 12), count):
-        try:
-            el = loc.nth(i)
-            txt = await el.inner_text()
-            if txt and txt.strip():
-                texts.append(txt.strip())
-        except Exception:
-            continue
-    return texts
+        await page.keyboard.press("Enter")
+
+
+# textContent identifies each message and drives de-duplication; nested
+# message containers often repeat the same text, so duplicates are dropped in
+# the browser before innerText is read. Scoring uses innerText because only it
+# keeps the line breaks between rendered list items and headings.
+_COLLECT_TEXTS_JS = """(els, rawSelector) => {
+    const seen = new Set();
+    return els.slice(-12).map(e => [(e.textContent || '').trim(), e])
+        .filter(([text]) => text && !seen.has(text) && seen.add(text))
+        .map(([text, e]) => {
+            const blocks = e.querySelectorAll(rawSelector);
+            const raw = blocks.length ? (blocks[blocks.length - 1].textContent || '').trim() : '';
+            return [text, raw, (e.innerText || '').trim()];
+        });
+}"""
+
+# The chosen message's innerText is read again once polling settles, so the
+# returned text reflects the final render.
+_RENDERED_TEXT_JS = """(els, key) => {
+    for (let i = els.length - 1; i >= 0; i--) {
+        if ((els[i].textContent || '').trim() === key) {
+            return (els[i].innerText || '').trim();
+        }
+    }
+    return null;
+}"""
+
+
+async def _collect_texts(page: Page, selector: str) -> list[tuple[str, str, str]]:
+    """Collect texts of the last elements matching a selector in one round trip.
+
+    :param page: The Playwright page instance
+    :type page: Page
+    :param selector: Selector for message containers
+    :type selector: str
+    :returns: ``(text, raw, rendered)`` triples with unique texts, where ``raw``
+        is the last raw-markdown block inside the element (empty if it has
+        none) and ``rendered`` is the element's line-preserving innerText
+    :rtype: list[tuple[str, str, str]]
+    """
+    try:
+        rows: list[list[str]] = await page.locator(selector).evaluate_all(
+            _COLLECT_TEXTS_JS, RAW_MARKDOWN_SELECTOR_UNION
+        )
+    except Exception:
+        return []
+    return [(text, raw, rendered) for text, raw, rendered in rows]
+
+
+async def _rendered_text(page: Page, text: str) -> str:
+    """Return the rendered text of the message whose collected text is ``text``.
+
+    :param page: The Playwright page instance
+    :type page: Page
+    :param text: Text of the message as returned by ``_collect_texts``
+    :type text: str
+    :returns: The message's innerText, or ``text`` if it is no longer on the page
+    :rtype: str
+    """
+    try:
+        rendered: str | None = await page.locator(MESSAGE_SELECTOR_UNION).evaluate_all(
+            _RENDERED_TEXT_JS, text
+        )
+    except Exception:
+        return text
+    return rendered or text
 
 
 async def get_last_message_text(page: Page) -> str | None:
-    candidates: list[str] = []
-    for selector in MESSAGE_SELECTORS:
-        try:
-            if await page.is_visible(selector, timeout=300):
-                candidates.extend(await _collect_texts(page, selector))
-        except Exception:
-            continue
-    filtered = _filter_candidates(candidates, None)
-    return filtered[-1] if filtered else None
+    candidates = await _collect_texts(page, MESSAGE_SELECTOR_UNION)
+    filtered = _filter_candidates([text for text, _, _ in candidates], None)
+    return await _rendered_text(page, filtered[-1]) if filtered else None
 
 
 async def _extract_raw_markdown(page: Page) -> str | None:
-    latest: str | None = None
-    for selector in RAW_MARKDOWN_SELECTORS:
-        try:
-            locator = page.locator(selector)
-            count = await locator.count()
-        except Exception:
-            continue
-        if not count:
-            continue
-        for index in range(count):
-            try:
-                text = await locator.nth(index).text_content()
-            except Exception:
-                continue
-            if text and text.strip():
-                latest = text.strip()
-        if latest:
-            break
-    return latest
+    # Query every selector concurrently, then honour their priority order
+    results = await asyncio.gather(
+        *(
+            page.locator(selector).evaluate_all(
+                "els => els.map(e => (e.textContent || '').trim()).filter(Boolean)"
+            )
+            for selector in RAW_MARKDOWN_SELECTORS
+        ),
+        return_exceptions=True,
+    )
+    for texts in results:
+        if isinstance(texts, list) and texts:
+            return str(texts[-1])
+    return None
 
 
 def _filter_candidates(candidates: list[str], exclude_text: str | None) -> list[str]:
     """Filter out noise and duplicates from chat message candidates.
 
+    Candidates are expected to be stripped already, as returned by
+    ``_collect_texts``.
+
     :param candidates: List of candidate message texts
     :type candidates: list[str]
     :param exclude_text: Text to exclude from results (e.g., user's prompt)
@@ -89,26 +149,36 @@ def _filter_candidates(candidates: list[str], exclude_text: str | None) -> list[
     :returns: Filtered list of unique, relevant messages
     :rtype: list[str]
     """
-    seen = set()
+    exclude = exclude_text.strip() if exclude_text else None
+    noisy = NOISY_PHRASES_PATTERN.search
+    seen: set[str] = set()
     filtered: list[str] = []
     for t in candidates:
-        if exclude_text and exclude_text.strip() in t:
+        # Cheapest checks first: empties and repeats never reach the regex
+        if not t or t in seen:
             continue
-        if any(t.startswith(pfx) for pfx in STATUS_PREFIXES):
+        if (exclude is not None and exclude in t) or t.startswith(STATUS_PREFIXES) or noisy(t):
             continue
-        if any(phrase in t for phrase in NOISY_PHRASES):
-            continue
-        key = t.strip()
-        if key and key not in seen:
-            seen.add(key)
-            filtered.append(key)
+        seen.add(t)
+        filtered.append(t)
     return filtered
 
 
+def _first_lines(text: str, limit: int) -> Iterator[str]:
+    """Yield up to ``limit`` stripped, non-empty lines from the start of text."""
+    lines = (match.group().strip() for match in LINE_PATTERN.finditer(text))
+    return islice((line for line in lines if line), limit)
+
+
 def _score(text: str) -> tuple[int, int]:
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-    bullet_lines = sum(1 for ln in lines if ln.startswith(("- ", "* ", "• ")))
-    has_heading = any(ln.startswith("#") or ln.endswith(":") for ln in lines[:3])
+    # Only "none", "one" or "several" bullets matter, so stop after the second.
+    # A bullet needs a marker followed by a space; plain prose usually has
+    # none, and a substring test rules that out without running the regex.
+    if "- " in text or "* " in text or "• " in text:
+        bullet_lines = sum(1 for _ in islice(BULLET_LINE_PATTERN.finditer(text), 2))
+    else:
+        bullet_lines = 0
+    has_heading = any(ln.startswith("#") or ln.endswith(":") for ln in _first_lines(text, 3))
     score = 0
     if bullet_lines >= 2:
         score += 3
@@ -120,6 +190,18 @@ def _score(text: str) -> tuple[int, int]:
     return score, len(text)
 
 
+_EDIT_IN_PAGE_LEN = len("Edit in a page")
+_EDIT_IN_PAGE_TAIL = 64
+
+
+def _break_before_heading(match: re.Match[str]) -> str:
+    return "\n\n" + match.group(1).strip()
+
+
+def _break_after_rule(match: re.Match[str]) -> str:
+    return f"{match.group(1)}\n\n{match.group(2).strip()}"
+
+
 def _normalise_response(text: str) -> str:
     """Normalize Copilot response text into clean Markdown.
 
@@ -131,56 +213,166 @@ def _normalise_response(text: str) -> str:
     # Unescape HTML entities
     text = unescape(text)
 
-    # Remove citation patterns
-    text = CITATION_PATTERN.sub("", text)
+    # Remove citation patterns. Each pass below is skipped when the literal it
+    # needs is absent; a substring test is far cheaper than a regex scan.
+    if "CITATION" in text:
+        text = CITATION_PATTERN.sub("", text)
 
-    # Remove carriage returns
-    text = re.sub(r"\r", "", text)
+    # Drop carriage returns and strip spaces/tabs around every line in one
+    # pass. The final line keeps trailing blanks, matching the previous
+    # newline-anchored trailing-whitespace rule.
+    *lines, last = text.replace("\r", "").split("\n")
+    lines = [line.strip(" \t") for line in lines]
+    lines.append(last.lstrip(" \t"))
+    text = "\n".join(lines)
 
-    # Remove trailing whitespace from lines
-    text = re.sub(r"[ \t]+\n", "\n", text)
+    has_rule = "---" in text
+    if has_rule:
+        # Normalize horizontal rules (---)
+        text = HORIZONTAL_RULE_PATTERN.sub("\n\n---\n\n", text)
 
-    # Remove leading whitespace from lines
-    text = re.sub(r"\n[ \t]+", "\n", text)
+    if "#" in text:
+        # Add newlines before headings
+        text = HEADING_PATTERN.sub(_break_before_heading, text)
 
-    # Remove leading whitespace from all lines
-    text = re.sub(r"^[ \t]+", "", text, flags=re.MULTILINE)
-
-    # Normalize horizontal rules (---)
-    text = re.sub(r"(?:^|\n)\s*-{3,}\s*(?=\n|$)", "\n\n---\n\n", text)
-
-    # Add newlines before headings
-    text = re.sub(
-        r"(?<!\n)(#{1,6}\s+[^\n]+)",
-        lambda m: "\n\n" + m.group(1).strip(),
-        text,
-    )
-
-    # Ensure proper spacing after horizontal rules before headings
-    text = re.sub(
-        r"(---)\s+(#{1,6}\s+[^\n]+)",
-        lambda m: f"{m.group(1)}\n\n{m.group(2).strip()}",
-        text,
-    )
+        if has_rule:
+            # Ensure proper spacing after horizontal rules before headings
+            text = RULE_HEADING_PATTERN.sub(_break_after_rule, text)
 
     # Add newlines before bullet points
-    text = re.sub(r"(?<!\n)[ \t]+([-*•]\s)", r"\n\1", text)
+    if "-" in text or "*" in text or "•" in text:
+        text = INLINE_BULLET_PATTERN.sub(r"\n\1", text)
 
     # Add newlines before numbered lists
-    text = re.sub(r"(?<![\n-])[ \t]+(\d+\.\s)", r"\n\1", text)
+    if "." in text:
+        text = INLINE_NUMBERED_PATTERN.sub(r"\n\1", text)
 
     # Normalize multiple newlines to at most 2
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    if "\n\n\n" in text:
+        text = EXCESS_NEWLINES_PATTERN.sub("\n\n", text)
 
     # Remove "Copilot said" prefix
-    text = re.sub(r"^copilot said\s*", "", text, flags=re.IGNORECASE)
+    text = COPILOT_SAID_PATTERN.sub("", text)
 
-    # Remove "Edit in a page" suffix
-    text = re.sub(r"\n?Edit in a page\s*$", "", text, flags=re.IGNORECASE)
+    # Remove "Edit in a page" suffix. The pattern is anchored at the end, so
+    # only a short tail needs checking (unless it is all whitespace).
+    tail = text[-_EDIT_IN_PAGE_TAIL:].rstrip()
+    if len(tail) < _EDIT_IN_PAGE_LEN or EDIT_IN_PAGE_PATTERN.search(tail):
+        text = EDIT_IN_PAGE_PATTERN.sub("", text)
 
     return text.strip()
 
 
+async def _is_streaming(stop_button: Locator) -> bool:
+    try:
+        return await stop_button.is_visible()
+    except Exception:
+        return False
+
+
+async def _finalise_response(page: Page, text: str, normalise: bool, raw: str | None = None) -> str:
+    """Turn the selected message text into the value returned to callers.
+
+    :param page: The Playwright page instance
+    :type page: Page
+    :param text: The selected message text
+    :type text: str
+    :param normalise: Whether to normalize the markdown
+    :type normalise: bool
+    :param raw: Raw markdown already captured for the message, if any
+    :type raw: str | None
+    :returns: Normalised text, or raw markdown when available and not normalising
+    :rtype: str
+    """
+    if normalise:
+        return _normalise_response(text)
+    raw = raw or await _extract_raw_markdown(page)
+    return raw or text
+
+
+async def _poll_best_candidate(
+    page: Page,
+    timeout_ms: int,
+    exclude_text: str | None,
+    response_done: asyncio.Event,
+) -> tuple[str | None, str]:
+    """Poll message candidates until the best one is complete or time runs out.
+
+    A candidate counts as complete once the stop button is not visible and
+    either it stayed the same for ``RESPONSE_STABLE_MS`` of wall-clock time
+    (independent of the poll interval) or the stop button has disappeared
+    after being seen. A finished stream request only wakes the poll early:
+    handshake requests on the same host can finish before streaming starts.
+
+    :param page: The Playwright page instance
+    :type page: Page
+    :param timeout_ms: Maximum time to poll
+    :type timeout_ms: int
+    :param exclude_text: Text to exclude from results
+    :type exclude_text: str | None
+    :param response_done: Event set when a response stream request finishes;
+        used as a wake-up, never as a completion signal on its own
+    :type response_done: asyncio.Event
+    :returns: The best candidate seen (None if nothing matched) and the raw
+        markdown captured alongside it (empty if none)
+    :rtype: tuple[str | None, str]
+    """
+    stop_button = page.locator(", ".join(STOP_BUTTON_SELECTORS)).first
+
+    # Poll quickly while the answer may still be short, backing off while it
+    # stays unchanged and snapping back whenever it changes.
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_ms / 1000
+    interval_ms = POLL_INTERVAL_MIN_MS
+    last_best: str | None = None
+    last_raw = ""
+    stable_s = RESPONSE_STABLE_MS / 1000
+    changed_at = loop.time()
+    streaming_seen = False
+    # The same message texts come back on every poll; score each only once.
+    # Scores are computed on the rendered text, which keeps line structure.
+    scores: dict[str, tuple[int, int]] = {}
+    rendered_by_text: dict[str, str] = {}
+
+    def _cached_score(text: str) -> tuple[int, int]:
+        score = scores.get(text)
+        if score is None:
+            score = scores[text] = _score(rendered_by_text[text])
+        return score
+
+    while loop.time() < deadline:
+        candidates = await _collect_texts(page, MESSAGE_SELECTOR_UNION)
+        raw_by_text = {text: raw for text, raw, _ in candidates}
+        rendered_by_text = {text: rendered or text for text, _, rendered in candidates}
+        streaming = await _is_streaming(stop_button)
+        streaming_seen = streaming_seen or streaming
+        filtered = _filter_candidates(list(raw_by_text), exclude_text)
+        if filtered:
+            best = max(filtered, key=_cached_score)
+            if last_best == best:
+                interval_ms = min(interval_ms * 2, POLL_INTERVAL_MS)
+            else:
+                last_best = best
+                changed_at = loop.time()
+                interval_ms = POLL_INTERVAL_MIN_MS
+            last_raw = raw_by_text[best]
+            stable = loop.time() - changed_at >= stable_s
+            signalled = stable or streaming_seen
+            if signalled and not streaming:
+                return last_best, last_raw
+        else:
+            interval_ms = min(interval_ms * 2, POLL_INTERVAL_MS)
+        # Never sleep past the deadline
+        wait_s = min(interval_ms / 1000, max(0.0, deadline - loop.time()))
+        if response_done.is_set():
+            await asyncio.sleep(wait_s)
+        else:
+            # Wake early when the response stream finishes
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(response_done.wait(), timeout=wait_s)
+    return last_best, last_raw
+
+
 async def read_response_text(
     page: Page,
     timeout_ms: int | None = None,
@@ -191,7 +383,8 @@ async def read_response_text(
 
     :param page: The Playwright page instance
     :type page: Page
-    :param timeout_ms: Maximum time to wait for response (uses NETWORK_IDLE_TIMEOUT_MS if None)
+    :param timeout_ms: Maximum total time to wait for the response, covering
+        both the first message and polling (uses NETWORK_IDLE_TIMEOUT_MS if None)
     :type timeout_ms: int | None
     :param exclude_text: Text to exclude from results
     :type exclude_text: str | None
@@ -202,62 +395,45 @@ async def read_response_text(
     """
     if timeout_ms is None:
         timeout_ms = NETWORK_IDLE_TIMEOUT_MS
+    # One budget covers both waiting for the first message and polling
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_ms / 1000
 
-    await page.wait_for_load_state("networkidle")
+    def _remaining_ms() -> int:
+        return max(0, int((deadline - loop.time()) * 1000))
 
-    interval_ms = POLL_INTERVAL_MS
-    elapsed = 0
-    last_best: str | None = None
-    stable_ticks = 0
-
-    while elapsed < timeout_ms:
-        candidates: list[str] = []
-        for selector in MESSAGE_SELECTORS:
-            try:
-                if await page.is_visible(selector, timeout=500):
-                    candidates.extend(await _collect_texts(page, selector))
-            except Exception:
-                continue
-        filtered = _filter_candidates(candidates, exclude_text)
-        if filtered:
-            best = max(filtered, key=_score)
-            if last_best == best:
-                stable_ticks += 1
-            else:
-                last_best = best
-                stable_ticks = 0
-            if stable_ticks >= 2:
-                if not normalise:
-                    raw = await _extract_raw_markdown(page)
-                    if raw:
-                        return raw
-                return _normalise_response(last_best) if normalise else last_best
-        await page.wait_for_timeout(interval_ms)
-        elapsed += interval_ms
+    response_done = asyncio.Event()
+
+    def _on_request_finished(request: Request) -> None:
+        if RESPONSE_STREAM_URL_PATTERN.search(request.url):
+            response_done.set()
+
+    page.on("requestfinished", _on_request_finished)
+    try:
+        # networkidle never settles reliably while Copilot streams, so wait for
+        # the first message to render and rely on UI/network completion signals.
+        with contextlib.suppress(Exception):
+            await page.locator(MESSAGE_SELECTOR_UNION).first.wait_for(
+                state="visible", timeout=timeout_ms
+            )
+        last_best, last_raw = await _poll_best_candidate(
+            page, _remaining_ms(), exclude_text, response_done
+        )
+    finally:
+        page.remove_listener("requestfinished", _on_request_finished)
 
     if last_best:
-        if not normalise:
-            raw = await _extract_raw_markdown(page)
-            if raw:
-                return raw
-        return _normalise_response(last_best) if normalise else last_best
+        text = await _rendered_text(page, last_best)
+        return await _finalise_response(page, text, normalise, raw=last_raw)
     base = await get_last_message_text(page)
     if base:
-        if not normalise:
-            raw = await _extract_raw_markdown(page)
-            if raw:
-                return raw
-        return _normalise_response(base) if normalise else base
+        return await _finalise_response(page, base, normalise)
     try:
         main = await page.inner_text("main")
         if exclude_text and exclude_text.strip() in main:
             main = main.replace(exclude_text, "").strip()
         if main:
-            if not normalise:
-                raw = await _extract_raw_markdown(page)
-                if raw:
-                    return raw
-            return _normalise_response(main) if normalise else main
+            return await _finalise_response(page, main, normalise)
     except Exception:
         pass
     return ""
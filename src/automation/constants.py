@@ -5,6 +5,7 @@ constants to make them easier to maintain and update.
 """
 
 import re
+from typing import Final
 
 # ============================================================================
 # Timeout Constants (in milliseconds)
@@ -12,10 +13,12 @@ import re
 
 DEFAULT_TIMEOUT_MS = 45000  # 45 seconds
 NETWORK_IDLE_TIMEOUT_MS = 90000  # 90 seconds
-POLL_INTERVAL_MS = 1000  # 1 second
+POLL_INTERVAL_MS = 1500  # 1.5 seconds, upper bound for response polling
+POLL_INTERVAL_MIN_MS = 150  # 0.15 seconds, first response poll interval
+RESPONSE_STABLE_MS = 2000  # 2 seconds an unchanged answer must hold to count as complete
 SELECTOR_WAIT_MS = 500  # 0.5 seconds
-MENU_ANIMATION_MS = 800  # 0.8 seconds
-FILE_ATTACHMENT_MS = 1500  # 1.5 seconds
+MENU_ANIMATION_MS = 800  # 0.8 seconds (upper bound is 3x while waiting for the menu)
+FILE_ATTACHMENT_MS = 1500  # 1.5 seconds (upper bound while waiting for the chip)
 
 # ============================================================================
 # Prompt Constants
@@ -37,6 +40,31 @@ MESSAGE_SELECTORS = (
     'div[role="dialog"] article',
     '[data-testid="message"]',
 )
+MESSAGE_SELECTOR_UNION = ", ".join(MESSAGE_SELECTORS)
+
+# Prompt composer
+PROMPT_INPUT_SELECTOR = 'textarea, [role="textbox"]'
+
+# Stop button selectors - visible while Copilot is still streaming a response
+STOP_BUTTON_SELECTORS = (
+    'button[aria-label="Stop"]',
+    'button[data-testid="stop-button"]',
+)
+
+# New chat button selectors - start a fresh conversation without a page reload
+NEW_CHAT_SELECTORS = (
+    'button[aria-label="New chat"]',
+    'button[data-testid="new-chat-button"]',
+    'a[aria-label="New chat"]',
+)
+NEW_CHAT_SELECTOR_UNION = ", ".join(NEW_CHAT_SELECTORS)
+
+# Send button selectors - used to submit a prompt
+SEND_BUTTON_SELECTORS = (
+    'button[aria-label="Send"]',
+    'button[data-testid="send-button"]',
+    'button[type="submit"]',
+)
 
 # Raw markdown selectors - for extracting pre-formatted code blocks
 RAW_MARKDOWN_SELECTORS = (
@@ -45,6 +73,7 @@ RAW_MARKDOWN_SELECTORS = (
     "div.rounded-b-xl pre",
     "pre.markdown",
 )
+RAW_MARKDOWN_SELECTOR_UNION = ", ".join(RAW_MARKDOWN_SELECTORS)
 
 # Authentication selectors
 SIGN_IN_SELECTORS = (
@@ -55,6 +84,9 @@ SIGN_IN_SELECTORS = (
     'button:has-text("Sign in")',
 )
 
+# Hosts Copilot redirects to when the stored session is no longer valid
+LOGIN_HOSTS = frozenset({"login.microsoftonline.com", "login.live.com"})
+
 LOGGED_IN_INDICATORS = (
     '[aria-label*="Account"]',
     '[data-testid*="user"]',
@@ -63,8 +95,18 @@ LOGGED_IN_INDICATORS = (
 )
 
 # File upload selectors
-PLUS_BUTTON_SELECTOR = '[data-testid="plus-button"]'
-FILE_UPLOAD_BUTTON_SELECTOR = '[data-testid="file-upload-button"]'
+PLUS_BUTTON_TEST_ID = "plus-button"
+FILE_UPLOAD_BUTTON_TEST_ID = "file-upload-button"
+PLUS_BUTTON_SELECTOR = f'[data-testid="{PLUS_BUTTON_TEST_ID}"]'
+FILE_UPLOAD_BUTTON_SELECTOR = f'[data-testid="{FILE_UPLOAD_BUTTON_TEST_ID}"]'
+FILE_INPUT_SELECTOR = 'input[type="file"]'
+# Attachment chip rendered in the composer once an upload has been accepted
+ATTACHMENT_CHIP_SELECTORS = (
+    '[data-testid*="attachment"]',
+    '[data-testid*="file-chip"]',
+    '[aria-label*="attached" i]',
+)
+ATTACHMENT_CHIP_SELECTOR_UNION = ", ".join(ATTACHMENT_CHIP_SELECTORS)
 
 # Download selectors
 DOWNLOAD_BUTTON_SELECTORS = (
@@ -93,6 +135,32 @@ UI_CLEANUP_SELECTORS = (
 # Citation pattern for removing Copilot citations from responses
 CITATION_PATTERN = re.compile(r"\[_\{\{\{CITATION\{\{\{_?\d+\{\]\([^)]+\)")
 
+# Response normalisation patterns, compiled once and applied in order
+HORIZONTAL_RULE_PATTERN = re.compile(r"(?:^|\n)\s*-{3,}\s*(?=\n|$)")
+HEADING_PATTERN = re.compile(r"(?<!\n)(#{1,6}\s+[^\n]+)")
+RULE_HEADING_PATTERN = re.compile(r"(---)\s+(#{1,6}\s+[^\n]+)")
+INLINE_BULLET_PATTERN = re.compile(r"(?<!\n)[ \t]+([-*•]\s)")
+INLINE_NUMBERED_PATTERN = re.compile(r"(?<![\n-])[ \t]+(\d+\.\s)")
+EXCESS_NEWLINES_PATTERN = re.compile(r"\n{3,}")
+COPILOT_SAID_PATTERN = re.compile(r"^copilot said\s*", re.IGNORECASE)
+EDIT_IN_PAGE_PATTERN = re.compile(r"\n?Edit in a page\s*$", re.IGNORECASE)
+
+# Network requests that carry a streamed Copilot answer; their completion
+# signals that the response has been fully delivered
+# Negotiate/handshake requests share the chathub path but finish before streaming
+RESPONSE_STREAM_URL_PATTERN = re.compile(
+    r"^(?!.*negotiate).*(?:chathub|/chat/?stream|/streaming)", re.IGNORECASE
+)
+
+# Line boundaries as understood by str.splitlines()
+_LINE_BREAKS = "\n\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029"
+
+# A non-empty line, and a Markdown bullet line (used to score candidates)
+LINE_PATTERN = re.compile(f"[^{_LINE_BREAKS}]+")
+BULLET_LINE_PATTERN = re.compile(
+    f"(?:^|(?<=[{_LINE_BREAKS}]))[^\\S{_LINE_BREAKS}]*[-*•] [^{_LINE_BREAKS}]*?\\S"
+)
+
 # Status prefixes to filter out from chat messages
 STATUS_PREFIXES = ("You said", "Uploading file", "Uploaded file", "Working on it")
 
@@ -113,6 +181,7 @@ NOISY_PHRASES = (
     "Predict the future",
     "Improve communication",
 )
+NOISY_PHRASES_PATTERN = re.compile("|".join(re.escape(phrase) for phrase in NOISY_PHRASES))
 
 # ============================================================================
 # Markdown Instructions
@@ -130,27 +199,29 @@ MARKDOWN_INSTRUCTION = (
 MAX_FILE_SIZE_BYTES = 100 * 1024 * 1024
 
 # Allowed file extensions for upload
-ALLOWED_FILE_EXTENSIONS = {
-    ".txt",
-    ".pdf",
-    ".docx",
-    ".doc",
-    ".docm",
-    ".xlsx",
-    ".xls",
-    ".xlsm",
-    ".xlsb",
-    ".csv",
-    ".md",
-    ".py",
-    ".js",
-    ".json",
-    ".xml",
-    ".html",
-    ".css",
-    ".pptx",
-    ".ppt",
-}
+ALLOWED_FILE_EXTENSIONS = frozenset(
+    {
+        ".txt",
+        ".pdf",
+        ".docx",
+        ".doc",
+        ".docm",
+        ".xlsx",
+        ".xls",
+        ".xlsm",
+        ".xlsb",
+        ".csv",
+        ".md",
+        ".py",
+        ".js",
+        ".json",
+        ".xml",
+        ".html",
+        ".css",
+        ".pptx",
+        ".ppt",
+    }
+)
 
 # ============================================================================
 # Retry Configuration
@@ -159,3 +230,5 @@ ALLOWED_FILE_EXTENSIONS = {
 MAX_RETRIES = 3
 RETRY_DELAY_MS = 1000  # 1 second between retries
 EXPONENTIAL_BACKOFF = True
+RETRY_JITTER: Final = "full"  # Uniform in [0, backoff] so clients do not retry in lockstep
+RETRY_MAX_DELAY_MS = 30000  # Hard cap on a single backoff delay
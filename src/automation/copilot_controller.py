@@ -1,7 +1,10 @@
 import asyncio
 import re
+import weakref
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
+from urllib.parse import urlparse
 
 from playwright.async_api import Browser, BrowserContext, Page, async_playwright
 
@@ -11,13 +14,98 @@ from ..utils.config import get_settings
 from ..utils.logger import get_logger
 from .chat import read_response_text as _read_response_text
 from .chat import send_prompt as _send_prompt
-from .constants import LOGGED_IN_INDICATORS, MARKDOWN_INSTRUCTION, SIGN_IN_SELECTORS
+from .constants import (
+    LOGGED_IN_INDICATORS,
+    LOGIN_HOSTS,
+    MARKDOWN_INSTRUCTION,
+    MESSAGE_SELECTOR_UNION,
+    NEW_CHAT_SELECTOR_UNION,
+    PROMPT_INPUT_SELECTOR,
+    SELECTOR_WAIT_MS,
+    SIGN_IN_SELECTORS,
+)
+from .files import UploadSource
 from .files import download_next as _download_next
 from .files import upload_file as _upload_file
+from .pool import BrowserContextPool
 from .ui import prepare_chat_ui
 
 logger = get_logger(__name__)
 
+_SIGN_IN_MENU_NAME = re.compile(r"sign in", re.IGNORECASE)
+_PROFILE_MENU_NAME = re.compile(r"^profile image", re.IGNORECASE)
+
+
+@dataclass
+class _SharedBrowser:
+    playwright: Any
+    browser: Browser
+    users: int = 0
+
+
+@dataclass
+class _LoopBrowsers:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    browsers: dict[tuple[tuple[str, Any], ...], _SharedBrowser] = field(default_factory=dict)
+
+
+# Controllers launched with the same options on the same event loop share one
+# Playwright driver and Chromium process; each still gets its own isolated
+# BrowserContext. Playwright objects are bound to the loop that created them,
+# so every loop has its own registry and lock.
+_loop_browsers: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopBrowsers] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _shared_registry() -> _LoopBrowsers:
+    loop = asyncio.get_running_loop()
+    registry = _loop_browsers.get(loop)
+    if registry is None:
+        registry = _loop_browsers[loop] = _LoopBrowsers()
+    return registry
+
+
+async def _acquire_browser(launch_kwargs: dict[str, Any]) -> tuple[Any, Browser]:
+    """Return the shared Playwright driver and browser, launching them if needed.
+
+    :param launch_kwargs: Keyword arguments for ``chromium.launch``
+    :type launch_kwargs: dict[str, Any]
+    :returns: The Playwright driver and browser to use
+    :rtype: tuple[Any, Browser]
+    """
+    key = tuple(sorted(launch_kwargs.items()))
+    registry = _shared_registry()
+    async with registry.lock:
+        shared = registry.browsers.get(key)
+        if shared is None:
+            playwright = await async_playwright().start()
+            browser = await playwright.chromium.launch(**launch_kwargs)
+            shared = registry.browsers[key] = _SharedBrowser(playwright, browser)
+        shared.users += 1
+        return shared.playwright, shared.browser
+
+
+async def _release_browser(browser: Browser) -> None:
+    """Drop one reference to a shared browser, shutting it down after the last.
+
+    :param browser: Browser previously returned by :func:`_acquire_browser`
+    :type browser: Browser
+    """
+    registry = _shared_registry()
+    async with registry.lock:
+        browsers = registry.browsers
+        key = next((k for k, v in browsers.items() if v.browser is browser), None)
+        if key is None:
+            return
+        shared = browsers[key]
+        shared.users -= 1
+        if shared.users:
+            return
+        del browsers[key]
+    await shared.browser.close()
+    await shared.playwright.stop()
+
 
 class CopilotController:
     """Controller for interacting with MS365 Copilot through browser automation."""
@@ -28,6 +116,15 @@ class CopilotController:
         self.context: BrowserContext | None = None
         self.page: Page | None = None
         self.settings = get_settings()
+        # Plain-attribute snapshots of the fields read on every prompt
+        self._copilot_url: str = self.settings.copilot_url
+        self._force_markdown: bool = self.settings.force_markdown_responses
+        self._normalize_markdown: bool = self.settings.normalize_markdown
+        self._max_prompt_chars: int = getattr(self.settings, "max_prompt_chars", 1_000_000)
+        self._authenticated = False
+        self._auth_lock = asyncio.Lock()
+        self._pool: BrowserContextPool | None = None
+        self._last_page: Page | None = None
 
     async def __aenter__(self):
         await self.start()
@@ -37,14 +134,13 @@ class CopilotController:
         await self.close()
 
     async def start(self) -> None:
-        self._playwright = await async_playwright().start()
         launch_kwargs: dict[str, Any] = {"headless": self.settings.browser_headless}
         # Allow custom executable or channel if set (useful behind firewalls)
         if getattr(self.settings, "browser_executable_path", None):
             launch_kwargs["executable_path"] = self.settings.browser_executable_path
         if getattr(self.settings, "browser_channel", None):
             launch_kwargs["channel"] = self.settings.browser_channel
-        self.browser = await self._playwright.chromium.launch(**launch_kwargs)
+        self._playwright, self.browser = await _acquire_browser(launch_kwargs)
         storage = (
             str(self.settings.storage_state_path)
             if self.settings.storage_state_path.exists()
@@ -52,39 +148,58 @@ class CopilotController:
         )
         self.context = await self.browser.new_context(storage_state=storage)
         self.page = await self.context.new_page()
+        # The primary session doubles as the first pooled session
+        self._pool = BrowserContextPool(
+            self._new_session,
+            max_size=getattr(self.settings, "browser_pool_size", 1),
+            idle_timeout=getattr(self.settings, "browser_pool_idle_timeout", 300.0),
+        )
+        self._pool.seed(self.context, self.page)
+        self._pool.start()
+
+    async def _new_session(self) -> tuple[BrowserContext, Page]:
+        """Open an extra context sharing the persisted authentication state."""
+        assert self.browser
+        storage = (
+            str(self.settings.storage_state_path)
+            if self.settings.storage_state_path.exists()
+            else None
+        )
+        context = await self.browser.new_context(storage_state=storage)
+        return context, await context.new_page()
 
     async def _check_if_logged_in(self, page: Page) -> bool:
         """Check if the user is actually logged in to Copilot."""
+        sign_in_labels = (*SIGN_IN_SELECTORS, "sign-in menuitem")
+        logged_in_labels = (*LOGGED_IN_INDICATORS, "profile menuitem")
         for attempt in range(2):
             try:
-                for indicator in SIGN_IN_SELECTORS:
-                    if await page.is_visible(indicator, timeout=2000):
+                # Probe every indicator concurrently; sign-in hits take precedence
+                sign_in_menu = page.get_by_role("menuitem", name=_SIGN_IN_MENU_NAME)
+                profile_menu = page.get_by_role("menuitem", name=_PROFILE_MENU_NAME)
+                is_visible = page.is_visible
+                results = await asyncio.gather(
+                    *(is_visible(sel, timeout=2000) for sel in SIGN_IN_SELECTORS),
+                    sign_in_menu.is_visible(timeout=2000),
+                    *(is_visible(sel, timeout=2000) for sel in LOGGED_IN_INDICATORS),
+                    profile_menu.is_visible(timeout=2000),
+                    return_exceptions=True,
+                )
+                sign_in_hits = results[: len(sign_in_labels)]
+                logged_in_hits = results[len(sign_in_labels) :]
+
+                for label, hit in zip(sign_in_labels, sign_in_hits, strict=True):
+                    if hit is True:
                         logger.warning(
                             "Found sign-in indicator %s; session considered unauthenticated",
-                            indicator,
+                            label,
                         )
                         return False
 
-                sign_in_menu = page.get_by_role(
-                    "menuitem", name=re.compile(r"sign in", re.IGNORECASE)
-                )
-                if await sign_in_menu.is_visible(timeout=2000):
-                    logger.warning(
-                        "Found sign-in menuitem locator; session considered unauthenticated"
-                    )
-                    return False
-
-                for indicator in LOGGED_IN_INDICATORS:
-                    if await page.is_visible(indicator, timeout=2000):
-                        logger.debug("Found logged-in indicator %s", indicator)
+                for label, hit in zip(logged_in_labels, logged_in_hits, strict=True):
+                    if hit is True:
+                        logger.debug("Found logged-in indicator %s", label)
                         return True
-
-                profile_menu = page.get_by_role(
-                    "menuitem", name=re.compile(r"^profile image", re.IGNORECASE)
-                )
-                if await profile_menu.is_visible(timeout=2000):
-                    logger.debug("Found profile menu item (logged in)")
-                    return True
             except Exception as exc:  # pragma: no cover - defensive
                 logger.debug("Authentication probe attempt %d failed: %s", attempt + 1, exc)
 
@@ -98,7 +213,14 @@ class CopilotController:
     async def ensure_authenticated(self) -> None:
         if not self.context:
             raise RuntimeError("Controller not started")
+        if self._authenticated:
+            return
+        async with self._auth_lock:
+            if not self._authenticated:
+                await self._authenticate()
 
+    async def _authenticate(self) -> None:
+        assert self.context
         needs_login = False
 
         # Check if storage state file exists
@@ -109,7 +231,7 @@ class CopilotController:
             # Storage state exists, but verify it's actually valid
             logger.debug("Storage state exists, verifying authentication...")
             assert self.page
-            await self.page.goto(self.settings.copilot_url)
+            await self.page.goto(self._copilot_url)
             await self.page.wait_for_load_state("networkidle")
 
             if not await self._check_if_logged_in(self.page):
@@ -117,6 +239,7 @@ class CopilotController:
                 needs_login = True
 
         if needs_login:
+            self.settings.hydrate_from_keyring()
             if not (self.settings.username and self.settings.password):
                 raise RuntimeError(
                     "Missing credentials: set M365_USERNAME and M365_PASSWORD or provide an existing storage state"
@@ -128,58 +251,114 @@ class CopilotController:
                 password=self.settings.password or "",
                 mfa_secret=self.settings.mfa_secret,
             )
+        self._authenticated = True
 
-    async def chat(self, prompt: str) -> str:
-        await self.ensure_authenticated()
-        assert self.page
-        await self.page.goto(self.settings.copilot_url)
-        await prepare_chat_ui(self.page)
-        decorated = self._decorate_prompt(prompt)
-        # Build potentially chunked messages with final instruction included in last part
-        final_instruction = (
-            None if not self.settings.force_markdown_responses else MARKDOWN_INSTRUCTION
-        )
-        max_chars = getattr(self.settings, "max_prompt_chars", 1_000_000)
-        messages = build_copilot_chunk_messages(
-            decorated if not self.settings.force_markdown_responses else prompt,
-            max_chars,
-            final_instruction=final_instruction,
-        )
-        last_message = messages[-1]
-        for msg in messages:
-            await _send_prompt(self.page, msg)
-        return await _read_response_text(
-            self.page, exclude_text=last_message, normalise=self.settings.normalize_markdown
-        )
+    @staticmethod
+    def _redirected_to_login(page: Page) -> bool:
+        """Return True if the page was bounced to a Microsoft login host."""
+        return urlparse(page.url).hostname in LOGIN_HOSTS
+
+    async def _at_fresh_chat(self, page: Page) -> bool:
+        """Return True if ``page`` already shows an empty Copilot conversation.
+
+        Lets the first prompt reuse the load made while verifying the session
+        instead of navigating again; pages holding an earlier conversation are
+        always reloaded so old replies cannot be mistaken for the new one.
+        """
+        if not page.url.startswith(self._copilot_url):
+            return False
+        try:
+            prompt_boxes, messages = await asyncio.gather(
+                page.locator(PROMPT_INPUT_SELECTOR).count(),
+                page.locator(MESSAGE_SELECTOR_UNION).count(),
+            )
+        except Exception:
+            return False
+        return prompt_boxes > 0 and messages == 0
 
-    async def ask_with_file(self, file_path: Path, prompt: str) -> str:
+    async def _open_chat(self, page: Page, upload: UploadSource | None = None) -> None:
+        """Authenticate if needed, open Copilot and clear onboarding surfaces.
+
+        When ``upload`` is given it is attached only after the cleanup, whose
+        close/confirm buttons could otherwise dismiss the upload menu mid-flight.
+        """
         await self.ensure_authenticated()
-        assert self.page
-        await self.page.goto(self.settings.copilot_url)
-        await prepare_chat_ui(self.page)
-        await _upload_file(self.page, file_path)
-        decorated = self._decorate_prompt(prompt)
-        final_instruction = (
-            None if not self.settings.force_markdown_responses else MARKDOWN_INSTRUCTION
-        )
-        max_chars = getattr(self.settings, "max_prompt_chars", 1_000_000)
+        if not await self._at_fresh_chat(page):
+            await page.goto(self._copilot_url)
+        if self._redirected_to_login(page):
+            logger.warning("Copilot redirected to login; session expired")
+            self._authenticated = False
+            await self.ensure_authenticated()
+            await page.goto(self._copilot_url)
+        await prepare_chat_ui(page)
+        if upload is not None:
+            await _upload_file(page, upload)
+
+    async def chat(self, prompt: str) -> str:
+        if not self._pool:
+            raise RuntimeError("Controller not started")
+        async with self._pool.acquire() as page:
+            return await self._chat_on(page, prompt)
+
+    async def ask_with_file(self, source: UploadSource, prompt: str) -> str:
+        """Attach a file and ask ``prompt`` about it.
+
+        :param source: Path to the file, or an in-memory ``(name, content)`` payload
+        :type source: UploadSource
+        :param prompt: Question to ask about the attachment
+        :type prompt: str
+        :returns: Copilot's response text
+        :rtype: str
+        """
+        if not self._pool:
+            raise RuntimeError("Controller not started")
+        async with self._pool.acquire() as page:
+            return await self._chat_on(page, prompt, upload=source)
+
+    async def _chat_on(self, page: Page, prompt: str, upload: UploadSource | None = None) -> str:
+        await self._open_chat(page, upload)
+        self._last_page = page
+        # Build potentially chunked messages with final instruction included in last
+        # part; the chunker appends it, so the prompt is never copied just to decorate it
+        final_instruction = None if not self._force_markdown else MARKDOWN_INSTRUCTION
         messages = build_copilot_chunk_messages(
-            decorated if not self.settings.force_markdown_responses else prompt,
-            max_chars,
+            prompt,
+            self._max_prompt_chars,
             final_instruction=final_instruction,
         )
         last_message = messages[-1]
         for msg in messages:
-            await _send_prompt(self.page, msg)
+            await _send_prompt(page, msg)
         return await _read_response_text(
-            self.page, exclude_text=last_message, normalise=self.settings.normalize_markdown
+            page, exclude_text=last_message, normalise=self._normalize_markdown
         )
 
+    async def reset_conversation(self) -> None:
+        """Start a new conversation on the most recently used page.
+
+        Clicks Copilot's "New chat" control so the next prompt can reuse the
+        loaded page instead of navigating again; falls back to reloading the
+        Copilot URL when the control is missing or earlier replies linger.
+        """
+        page = self._last_page or self.page
+        if page is None:
+            raise RuntimeError("Controller not started")
+        try:
+            await page.locator(NEW_CHAT_SELECTOR_UNION).first.click(timeout=SELECTOR_WAIT_MS)
+            await page.locator(MESSAGE_SELECTOR_UNION).first.wait_for(
+                state="detached", timeout=SELECTOR_WAIT_MS * 4
+            )
+        except Exception as exc:
+            logger.debug("New chat control unavailable (%s); reloading Copilot", exc)
+            await page.goto(self._copilot_url)
+
     async def download_response(self, target_dir: Path, timeout_ms: int = 45000) -> Path:
-        assert self.page
+        # Downloads come from whichever pooled page served the latest response
+        page = self._last_page or self.page
+        assert page
         logger.info("Starting download into %s", target_dir)
         try:
-            path = await _download_next(self.page, target_dir, timeout_ms=timeout_ms)
+            path = await _download_next(page, target_dir, timeout_ms=timeout_ms)
             logger.info("Download completed: %s", path)
             return path
         except RuntimeError as exc:
@@ -187,29 +366,17 @@ class CopilotController:
             raise
 
     async def close(self) -> None:
-        if self.page:
-            await self.page.close()
-        if self.context:
-            await self.context.close()
-        if self.browser:
-            await self.browser.close()
-        if self._playwright:
-            await self._playwright.stop()
-
-    def _decorate_prompt(self, prompt: str) -> str:
-        """Decorate prompt with Markdown instruction if configured.
-
-        :param prompt: The user's prompt
-        :type prompt: str
-        :returns: Decorated prompt with Markdown instructions
-        :rtype: str
-        """
-        if not self.settings.force_markdown_responses:
-            return prompt
-        instruction = MARKDOWN_INSTRUCTION.strip()
-        if instruction.lower() in prompt.lower():
-            return prompt
-        prompt = prompt.rstrip()
-        if prompt:
-            return f"{prompt}\n\n{instruction}"
-        return instruction
+        # Detach everything first so a repeated close() releases the shared browser once
+        pool, self._pool = self._pool, None
+        page, self.page = self.page, None
+        context, self.context = self.context, None
+        browser, self.browser = self.browser, None
+        self._last_page = None
+        if pool:
+            await pool.close()
+        if page:
+            await page.close()
+        if context:
+            await context.close()
+        if browser:
+            await _release_browser(browser)
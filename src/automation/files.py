@@ -1,7 +1,11 @@
+import contextlib
+import mimetypes
+import stat
 import time
-from pathlib import Path
+from pathlib import Path, PurePath
 
-from playwright.async_api import Page
+from playwright.async_api import Download, FilePayload, Page
+from playwright.async_api import Error as PlaywrightError
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from src.exceptions import (
@@ -12,51 +16,108 @@ from src.exceptions import (
 )
 
 from ..utils.logger import get_logger
+from ..utils.paths import ensure_dir
 from ..utils.retry import retry_async
 from .constants import (
     ALLOWED_FILE_EXTENSIONS,
+    ATTACHMENT_CHIP_SELECTOR_UNION,
     DEFAULT_TIMEOUT_MS,
     DOWNLOAD_BUTTON_SELECTORS,
     EXPONENTIAL_BACKOFF,
     FILE_ATTACHMENT_MS,
-    FILE_UPLOAD_BUTTON_SELECTOR,
+    FILE_INPUT_SELECTOR,
+    FILE_UPLOAD_BUTTON_TEST_ID,
     MAX_FILE_SIZE_BYTES,
     MAX_RETRIES,
     MENU_ANIMATION_MS,
-    PLUS_BUTTON_SELECTOR,
+    PLUS_BUTTON_TEST_ID,
     RETRY_DELAY_MS,
+    RETRY_JITTER,
+    RETRY_MAX_DELAY_MS,
     SELECTOR_WAIT_MS,
 )
+from .ui import any_visible
 
 logger = get_logger(__name__)
 
+# Transient browser/UI failures worth retrying; anything else (validation,
+# programming errors) propagates immediately instead of burning the backoff.
+_RETRYABLE_ERRORS: tuple[type[Exception], ...] = (
+    PlaywrightTimeoutError,
+    UIInteractionError,
+)
 
-def validate_file(file_path: Path) -> None:
-    """Validate a file before upload.
+# A file on disk, or an in-memory ``(name, content)`` payload
+UploadSource = Path | tuple[str, bytes]
+InputFiles = str | FilePayload
 
-    :param file_path: Path to the file to validate
-    :type file_path: Path
-    :raises FileValidationError: If validation fails
-    """
-    if not file_path.exists():
-        raise FileValidationError(f"File does not exist: {file_path}")
 
-    if not file_path.is_file():
-        raise FileValidationError(f"Path is not a file: {file_path}")
+def _check_size_and_type(name: str, file_size: int) -> None:
+    """Apply the size and extension limits shared by on-disk and in-memory uploads.
 
-    file_size = file_path.stat().st_size
+    :param name: File name used for the extension check
+    :type name: str
+    :param file_size: Size of the content in bytes
+    :type file_size: int
+    :raises FileValidationError: If either limit is exceeded
+    """
     if file_size > MAX_FILE_SIZE_BYTES:
         size_mb = file_size / (1024 * 1024)
         max_mb = MAX_FILE_SIZE_BYTES / (1024 * 1024)
         raise FileValidationError(f"File too large: {size_mb:.1f}MB (max: {max_mb:.0f}MB)")
 
-    if file_path.suffix.lower() not in ALLOWED_FILE_EXTENSIONS:
+    suffix = PurePath(name).suffix
+    if suffix.lower() not in ALLOWED_FILE_EXTENSIONS:
         raise FileValidationError(
-            f"File type not allowed: {file_path.suffix} "
+            f"File type not allowed: {suffix} "
             f"(allowed: {', '.join(sorted(ALLOWED_FILE_EXTENSIONS))})"
         )
 
 
+def validate_file(file_path: Path) -> None:
+    """Validate a file before upload.
+
+    :param file_path: Path to the file to validate
+    :type file_path: Path
+    :raises FileValidationError: If validation fails
+    """
+    # One stat() call answers existence, type and size
+    try:
+        st = file_path.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        raise FileValidationError(f"File does not exist: {file_path}") from None
+
+    if not stat.S_ISREG(st.st_mode):
+        raise FileValidationError(f"Path is not a file: {file_path}")
+
+    _check_size_and_type(file_path.name, st.st_size)
+
+
+def _input_files(source: UploadSource) -> InputFiles:
+    """Validate an upload source and convert it to Playwright's input-file form.
+
+    In-memory payloads are handed to Playwright as a buffer, so nothing has to
+    be written to disk just to be read back for the upload.
+
+    :param source: Path to a file, or a ``(name, content)`` tuple
+    :type source: UploadSource
+    :returns: A path string or a file payload for ``set_input_files``
+    :rtype: InputFiles
+    :raises FileValidationError: If validation fails
+    """
+    if isinstance(source, tuple):
+        name, content = source
+        _check_size_and_type(name, len(content))
+        mime_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        return FilePayload(name=name, mimeType=mime_type, buffer=content)
+    validate_file(source)
+    return str(source)
+
+
+def _describe(source: UploadSource) -> str:
+    return source[0] if isinstance(source, tuple) else str(source)
+
+
 async def _click_with_retry(page: Page, test_id: str, description: str) -> None:
     """Click an element with retry logic for transient failures.
 
@@ -74,7 +135,7 @@ async def _click_with_retry(page: Page, test_id: str, description: str) -> None:
             element = page.get_by_test_id(test_id)
             await element.click()
             logger.debug("Clicked %s", description)
-        except Exception as exc:
+        except PlaywrightError as exc:
             raise UIInteractionError(f"Failed to click {description}: {exc}") from exc
 
     await retry_async(
@@ -82,66 +143,124 @@ async def _click_with_retry(page: Page, test_id: str, description: str) -> None:
         max_retries=MAX_RETRIES,
         delay_ms=RETRY_DELAY_MS,
         exponential_backoff=EXPONENTIAL_BACKOFF,
-        retry_on=(UIInteractionError, PlaywrightTimeoutError),
+        jitter=RETRY_JITTER,
+        max_delay_ms=RETRY_MAX_DELAY_MS,
+        retry_on=_RETRYABLE_ERRORS,
     )
 
 
-async def upload_file(page: Page, file_path: Path) -> None:
+async def _set_input_files_directly(page: Page, input_files: InputFiles) -> bool:
+    """Attach the file through a file input already present in the DOM.
+
+    ``set_input_files`` does not need the input to be visible, so when Copilot
+    has rendered its hidden input this skips the menu and file chooser entirely.
+
+    :param page: The Playwright page instance
+    :type page: Page
+    :param input_files: Path string or in-memory payload to attach
+    :type input_files: InputFiles
+    :returns: True if the file was attached, False if no usable input exists
+    :rtype: bool
+    """
+    file_input = page.locator(FILE_INPUT_SELECTOR)
+    try:
+        if not await file_input.count():
+            return False
+        await file_input.first.set_input_files(input_files, timeout=SELECTOR_WAIT_MS)
+    except PlaywrightError as exc:
+        logger.debug("Direct file input upload failed, using file chooser: %s", exc)
+        return False
+    return True
+
+
+async def _upload_via_file_chooser(page: Page, input_files: InputFiles) -> None:
+    """Attach the file by opening the + menu and intercepting the file chooser.
+
+    :param page: The Playwright page instance
+    :type page: Page
+    :param input_files: Path string or in-memory payload to attach
+    :type input_files: InputFiles
+    """
+    # Click the + button to open menu (with retry)
+    await _click_with_retry(
+        page,
+        PLUS_BUTTON_TEST_ID,
+        "+ button",
+    )
+    # Wait for the menu entry itself rather than a fixed animation delay; if it
+    # is slow to appear the retrying click below still gets its own attempts
+    upload_button = page.get_by_test_id(FILE_UPLOAD_BUTTON_TEST_ID)
+    with contextlib.suppress(PlaywrightTimeoutError):
+        await upload_button.wait_for(state="visible", timeout=MENU_ANIMATION_MS * 3)
+
+    # Set up file chooser listener and click upload button (with retry)
+    async def _click_upload_button() -> None:
+        async with page.expect_file_chooser() as fc_info:
+            await upload_button.click()
+            logger.debug("Clicked file upload button")
+
+        file_chooser = await fc_info.value
+        await file_chooser.set_files(input_files)
+
+    await retry_async(
+        _click_upload_button,
+        max_retries=MAX_RETRIES,
+        delay_ms=RETRY_DELAY_MS,
+        exponential_backoff=EXPONENTIAL_BACKOFF,
+        jitter=RETRY_JITTER,
+        max_delay_ms=RETRY_MAX_DELAY_MS,
+        retry_on=_RETRYABLE_ERRORS,
+    )
+
+
+async def _wait_for_attachment(page: Page) -> None:
+    """Wait until Copilot shows the attachment chip, at most FILE_ATTACHMENT_MS.
+
+    :param page: The Playwright page instance
+    :type page: Page
+    """
+    chip = page.locator(ATTACHMENT_CHIP_SELECTOR_UNION).first
+    try:
+        await chip.wait_for(state="visible", timeout=FILE_ATTACHMENT_MS)
+    except PlaywrightTimeoutError:
+        # Unknown chip markup: the bounded wait is no longer than the old fixed delay
+        logger.debug("No attachment chip seen within %dms", FILE_ATTACHMENT_MS)
+
+
+async def upload_file(page: Page, source: UploadSource) -> None:
     """Upload a file to Copilot with automatic retry on transient failures.
 
     The upload flow:
     1. Validate the file
-    2. Click the + button to open the menu (with retry)
-    3. Set up file chooser interception to avoid OS dialog
-    4. Click the file upload button (triggers file chooser event, with retry)
-    5. File chooser automatically selects our file
+    2. Set the file on Copilot's hidden file input if it is already present
+    3. Otherwise click the + button to open the menu (with retry)
+    4. Set up file chooser interception to avoid OS dialog
+    5. Click the file upload button (triggers file chooser event, with retry)
+    6. File chooser automatically selects our file
 
     :param page: The Playwright page instance
     :type page: Page
-    :param file_path: Path to the file to upload
-    :type file_path: Path
+    :param source: Path to the file, or an in-memory ``(name, content)`` payload
+    :type source: UploadSource
     :raises FileValidationError: If file validation fails
     :raises FileUploadError: If upload fails after retries
     """
     # Validate file first
-    validate_file(file_path)
+    input_files = _input_files(source)
 
-    logger.info("Starting file upload for %s", file_path)
+    logger.info("Starting file upload for %s", _describe(source))
 
     try:
-        # Step 1: Click the + button to open menu (with retry)
-        await _click_with_retry(
-            page,
-            PLUS_BUTTON_SELECTOR.split("=")[-1].strip('"]'),
-            "+ button",
-        )
-        await page.wait_for_timeout(MENU_ANIMATION_MS)
-
-        # Step 2 & 3: Set up file chooser listener and click upload button (with retry)
-        async def _click_upload_button() -> None:
-            async with page.expect_file_chooser() as fc_info:
-                file_upload_button = page.get_by_test_id(
-                    FILE_UPLOAD_BUTTON_SELECTOR.split("=")[-1].strip('"]')
-                )
-                await file_upload_button.click()
-                logger.debug("Clicked file upload button")
-
-            file_chooser = await fc_info.value
-            await file_chooser.set_files(str(file_path))
-
-        await retry_async(
-            _click_upload_button,
-            max_retries=MAX_RETRIES,
-            delay_ms=RETRY_DELAY_MS,
-            exponential_backoff=EXPONENTIAL_BACKOFF,
-            retry_on=(Exception,),
-        )
+        if await _set_input_files_directly(page, input_files):
+            logger.debug("Attached file through existing file input")
+        else:
+            await _upload_via_file_chooser(page, input_files)
 
-        logger.info("File uploaded successfully: %s", file_path)
+        logger.info("File uploaded successfully: %s", _describe(source))
 
-        # Step 4: Wait for file to be attached
-        await page.wait_for_timeout(FILE_ATTACHMENT_MS)
+        # Wait for file to be attached
         logger.debug("Waiting for file attachment to complete")
+        await _wait_for_attachment(page)
 
     except FileValidationError:
         # Re-raise validation errors as-is
@@ -151,6 +270,25 @@ async def upload_file(page: Page, file_path: Path) -> None:
         raise FileUploadError(f"File upload failed: {exc}") from exc
 
 
+async def _persist_download(download: Download, destination: Path) -> None:
+    """Move Playwright's temp file into place, copying only across filesystems.
+
+    :param download: The completed Playwright download
+    :type download: Download
+    :param destination: Final path for the artifact
+    :type destination: Path
+    """
+    try:
+        source = await download.path()
+    except PlaywrightError:
+        # Remote browsers keep the file on their side; only save_as can fetch it
+        source = None
+    if source is not None and source.stat().st_dev == destination.parent.stat().st_dev:
+        source.replace(destination)
+        return
+    await download.save_as(str(destination))
+
+
 async def download_next(page: Page, target_dir: Path, timeout_ms: int | None = None) -> Path:
     """Wait for the next download and persist it to target_dir.
 
@@ -167,7 +305,7 @@ async def download_next(page: Page, target_dir: Path, timeout_ms: int | None = N
     if timeout_ms is None:
         timeout_ms = DEFAULT_TIMEOUT_MS
 
-    target_dir.mkdir(parents=True, exist_ok=True)
+    ensure_dir(target_dir)
     logger.info(
         "Waiting for Copilot to provide a downloadable file (timeout=%ss)",
         timeout_ms / 1000,
@@ -175,17 +313,13 @@ async def download_next(page: Page, target_dir: Path, timeout_ms: int | None = N
 
     try:
         async with page.expect_download(timeout=timeout_ms) as dl_info:
-            clicked = False
-            for selector in DOWNLOAD_BUTTON_SELECTORS:
-                try:
-                    if await page.is_visible(selector, timeout=SELECTOR_WAIT_MS):
-                        await page.click(selector)
-                        clicked = True
-                        logger.debug("Clicked download trigger %s", selector)
-                        break
-                except Exception:
-                    continue
-            if not clicked:
+            # One combined locator: a single click RPC instead of probe + click per
+            # selector; hidden matches are filtered out so .first is clickable
+            trigger = any_visible(page, DOWNLOAD_BUTTON_SELECTORS).first
+            try:
+                await trigger.click(timeout=SELECTOR_WAIT_MS)
+                logger.debug("Clicked download trigger")
+            except PlaywrightError:
                 logger.debug(
                     "No explicit download trigger found; waiting for automatic download event"
                 )
@@ -198,6 +332,6 @@ async def download_next(page: Page, target_dir: Path, timeout_ms: int | None = N
 
     suggested = download.suggested_filename or f"copilot-download-{int(time.time())}"
     destination = target_dir / suggested
-    await download.save_as(str(destination))
+    await _persist_download(download, destination)
     logger.info("Saved Copilot download to %s", destination)
     return destination
@@ -0,0 +1,143 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+
+from playwright.async_api import BrowserContext, Page
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SessionFactory = Callable[[], Awaitable[tuple[BrowserContext, Page]]]
+
+
+@dataclass
+class _PooledSession:
+    context: BrowserContext
+    page: Page
+    last_used: float
+    owned: bool = True
+
+
+class BrowserContextPool:
+    """Bounded pool of browser contexts shared across concurrent prompts.
+
+    Contexts are created lazily through ``factory`` (which is expected to load
+    the authenticated storage state) and handed back to the pool after each
+    prompt instead of being closed. At most ``max_size`` sessions are checked
+    out at once; idle sessions beyond ``min_size`` are closed by a background
+    reaper once they have been unused for ``idle_timeout`` seconds.
+    """
+
+    def __init__(
+        self,
+        factory: SessionFactory,
+        *,
+        max_size: int = 1,
+        min_size: int = 1,
+        idle_timeout: float = 300.0,
+    ) -> None:
+        self._factory = factory
+        self._semaphore = asyncio.Semaphore(max(1, max_size))
+        self._min_size = min_size
+        self._idle_timeout = idle_timeout
+        self._idle: list[_PooledSession] = []
+        self._reaper: asyncio.Task[None] | None = None
+
+    def seed(self, context: BrowserContext, page: Page) -> None:
+        """Add an existing session to the pool without transferring ownership.
+
+        :param context: Context owned by the caller; never closed by the pool
+        :type context: BrowserContext
+        :param page: Page belonging to ``context``
+        :type page: Page
+        """
+        loop = asyncio.get_running_loop()
+        self._idle.append(_PooledSession(context, page, loop.time(), owned=False))
+
+    def start(self) -> None:
+        """Start the background task that closes idle contexts."""
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_forever())
+
+    @contextlib.asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Page]:
+        """Check out a page for the duration of the ``async with`` block.
+
+        The session goes back to the pool only if the block succeeded and the
+        page is still open; otherwise it is dropped (and closed if owned) so
+        later prompts never receive a dead page.
+
+        :returns: An async context manager yielding a ready-to-use page
+        :rtype: AsyncIterator[Page]
+        """
+        async with self._semaphore:
+            session = self._idle.pop() if self._idle else await self._create()
+            try:
+                yield session.page
+            except BaseException:
+                await self._discard(session)
+                raise
+            if session.page.is_closed():
+                await self._discard(session)
+            else:
+                self.release(session)
+
+    def release(self, session: _PooledSession) -> None:
+        """Return a checked-out session to the idle list."""
+        session.last_used = asyncio.get_running_loop().time()
+        self._idle.append(session)
+
+    async def reap_idle(self) -> int:
+        """Close owned sessions idle for longer than ``idle_timeout``.
+
+        :returns: Number of contexts closed
+        :rtype: int
+        """
+        now = asyncio.get_running_loop().time()
+        stale = sorted(
+            (s for s in self._idle if s.owned and now - s.last_used >= self._idle_timeout),
+            key=lambda s: s.last_used,
+        )
+        expired = stale[: max(0, len(self._idle) - self._min_size)]
+        for session in expired:
+            self._idle.remove(session)
+            await self._close_session(session)
+        if expired:
+            logger.debug("Closed %d idle browser context(s)", len(expired))
+        return len(expired)
+
+    async def close(self) -> None:
+        """Stop the reaper and close every context the pool created."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reaper
+            self._reaper = None
+        idle, self._idle = self._idle, []
+        for session in idle:
+            if session.owned:
+                await self._close_session(session)
+
+    async def _create(self) -> _PooledSession:
+        context, page = await self._factory()
+        logger.debug("Opened pooled browser context")
+        return _PooledSession(context, page, asyncio.get_running_loop().time())
+
+    async def _discard(self, session: _PooledSession) -> None:
+        if session.owned:
+            await self._close_session(session)
+        logger.debug("Dropped pooled browser context after a failure")
+
+    async def _reap_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self._idle_timeout)
+            await self.reap_idle()
+
+    @staticmethod
+    async def _close_session(session: _PooledSession) -> None:
+        with contextlib.suppress(Exception):
+            await session.page.close()
+        with contextlib.suppress(Exception):
+            await session.context.close()
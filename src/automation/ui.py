@@ -1,13 +1,64 @@
-from playwright.async_api import Page
+from collections.abc import Iterable
+
+from playwright.async_api import Locator, Page
 
 from .constants import SELECTOR_WAIT_MS, UI_CLEANUP_SELECTORS
 
 
+def any_of(page: Page, selectors: Iterable[str]) -> Locator:
+    """Build a single locator matching any of the given selectors.
+
+    Selectors are chained with ``Locator.or_`` rather than joined with a comma
+    so that non-CSS engines (``role=``, ``text=``) can be mixed freely. The
+    resulting locator resolves in one round trip instead of one per selector.
+
+    :param page: The Playwright page instance
+    :type page: Page
+    :param selectors: Selectors to combine, in order of preference
+    :type selectors: Iterable[str]
+    :returns: A locator matching any of the selectors
+    :rtype: Locator
+    """
+    iterator = iter(selectors)
+    locator = page.locator(next(iterator))
+    for selector in iterator:
+        locator = locator.or_(page.locator(selector))
+    return locator
+
+
+def any_visible(page: Page, selectors: Iterable[str]) -> Locator:
+    """Like :func:`any_of`, but matching only visible elements.
+
+    ``.first`` on a combined locator follows DOM order, so without the filter
+    a hidden early match would be picked and its click would time out while
+    a visible match later in the page is ignored. The ``visible=true`` engine
+    also works after ``role=`` and ``text=`` selectors, unlike CSS ``:visible``.
+
+    :param page: The Playwright page instance
+    :type page: Page
+    :param selectors: Selectors to combine, in order of preference
+    :type selectors: Iterable[str]
+    :returns: A locator matching visible elements for any of the selectors
+    :rtype: Locator
+    """
+    return any_of(page, (f"{sel} >> visible=true" for sel in selectors))
+
+
 async def prepare_chat_ui(page: Page) -> None:
-    # Try to accept cookies/permissions and close onboarding surfaces
-    for sel in UI_CLEANUP_SELECTORS:
+    # Try to accept cookies/permissions and close onboarding surfaces. One
+    # combined locator waits for any of them instead of probing each in turn.
+    dismiss = any_visible(page, UI_CLEANUP_SELECTORS)
+    first = dismiss.first
+    try:
+        await first.wait_for(state="visible", timeout=SELECTOR_WAIT_MS)
+    except Exception:
+        return
+    # Bounded so a button that survives its own click cannot loop forever
+    count, click = dismiss.count, first.click
+    for _ in range(len(UI_CLEANUP_SELECTORS)):
         try:
-            if await page.is_visible(sel, timeout=SELECTOR_WAIT_MS):
-                await page.click(sel)
+            if not await count():
+                break
+            await click(timeout=SELECTOR_WAIT_MS)
         except Exception:
-            continue
+            break
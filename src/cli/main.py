@@ -1,23 +1,105 @@
 import asyncio
+import contextlib
+import hashlib
 import os
+import signal
+import sys
+from collections.abc import Coroutine
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 import click
-from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
+import orjson
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - not installed on Windows
+    uvloop = None
 
-from ..automation.copilot_controller import CopilotController
-from ..automation.ui import prepare_chat_ui
 from ..utils.config import get_settings
 from ..utils.logger import get_logger
+from ..utils.logger import set_level as set_log_level
+from ..utils.paths import ensure_dir
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+    from ..automation.copilot_controller import CopilotController
 
-console = Console()
+
+MANUAL_AUTH_DEBOUNCE_S = 1.0
 logger = get_logger(__name__)
 
+# Parameter types shared by several options, built once at import
+_OUT_PATH = click.Path(dir_okay=False, writable=True)
+_FILE_PATH = click.Path(exists=True, dir_okay=False)
+_DIR_PATH = click.Path(file_okay=False)
+_LOG_LEVEL_CHOICE = click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False)
+
+
+# Rich and Playwright are imported on first use so that dispatch and --help
+# do not pay for them.
+@lru_cache(maxsize=1)
+def _console() -> "Console":
+    from rich.console import Console  # noqa: PLC0415
+
+    return Console()
+
+
+def _status(message: str) -> contextlib.AbstractContextManager[object]:
+    """Show a spinner while waiting, but only when a person is watching.
+
+    When stdout is not a terminal (CI, pipes) the live renderer would only
+    burn CPU repainting output nobody sees, so a no-op context is returned.
+    """
+    if not sys.stdout.isatty():
+        return contextlib.nullcontext()
+    return _console().status(message, spinner="dots")
+
+
+def _print_response(text: str) -> None:
+    if not sys.stdout.isatty():
+        # Piped output gets the raw Markdown; skip the parser and panel layout
+        sys.stdout.write(text if text.endswith("\n") else f"{text}\n")
+        return
+    from rich.markdown import Markdown  # noqa: PLC0415
+    from rich.panel import Panel  # noqa: PLC0415
+
+    _console().print(Panel(Markdown(text), title="Copilot", border_style="green"))
+
+
+def _controller() -> "CopilotController":
+    from ..automation.copilot_controller import CopilotController  # noqa: PLC0415
+
+    return CopilotController()
+
+
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create the CLI event loop: uvloop when installed, eager tasks on 3.12+."""
+    loop: asyncio.AbstractEventLoop
+    if uvloop is not None and sys.platform != "win32":
+        loop = uvloop.new_event_loop()
+    else:
+        loop = asyncio.new_event_loop()
+    # Tasks run synchronously until their first real suspension point
+    eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+    if eager_task_factory is not None:
+        loop.set_task_factory(eager_task_factory)
+    return loop
+
 
 def run(coro):
-    return asyncio.run(coro)
+    """Run a CLI coroutine to completion on a fresh event loop."""
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=_new_event_loop) as runner:
+            return runner.run(coro)
+    loop = _new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
 
 
 class GlobalState:
@@ -34,9 +116,7 @@ gstate = GlobalState()
 
 @click.group(context_settings={"help_option_names": ["-h", "--help"]})
 @click.option("--headless/--headed", default=True, help="Run browser headless or headed")
-@click.option(
-    "--output-dir", type=click.Path(file_okay=False), default=None, help="Output directory"
-)
+@click.option("--output-dir", type=_DIR_PATH, default=None, help="Output directory")
 @click.option(
     "--force-markdown/--no-force-markdown",
     default=None,
@@ -49,7 +129,7 @@ gstate = GlobalState()
 )
 @click.option(
     "--log-level",
-    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
+    type=_LOG_LEVEL_CHOICE,
     default=None,
 )
 @click.option(
@@ -76,6 +156,7 @@ def cli(
     gstate.max_prompt_chars = max_prompt_chars
     if log_level:
         os.environ["LOG_LEVEL"] = log_level.upper()
+        set_log_level(log_level)
 
 
 def _apply_overrides():
@@ -85,7 +166,7 @@ def _apply_overrides():
         settings.browser_headless = gstate.headless
     if gstate.output_dir:
         settings.output_directory = gstate.output_dir
-        settings.output_directory.mkdir(parents=True, exist_ok=True)
+        ensure_dir(settings.output_directory)
     if gstate.force_markdown is not None:
         settings.force_markdown_responses = gstate.force_markdown
     if gstate.normalize_markdown is not None:
@@ -95,6 +176,67 @@ def _apply_overrides():
     return settings
 
 
+async def _save_storage_state_on_change(context, page, path: Path) -> None:
+    """Persist the context's storage state whenever browsing activity may have changed it.
+
+    Navigations and responses only set an event; after a short debounce the
+    state is serialised once and written only if its digest differs from the
+    last write. Runs until cancelled; cancellation takes one final snapshot so
+    a change still inside the debounce window is not lost.
+    """
+    changed = asyncio.Event()
+    last_digest = None
+
+    def _mark_changed(_event) -> None:
+        changed.set()
+
+    async def _save() -> None:
+        nonlocal last_digest
+        changed.clear()
+        payload = orjson.dumps(await context.storage_state(), option=orjson.OPT_SORT_KEYS)
+        digest = hashlib.blake2b(payload, digest_size=16).digest()
+        if digest != last_digest:
+            await asyncio.to_thread(path.write_bytes, payload)
+            last_digest = digest
+
+    page.on("framenavigated", _mark_changed)
+    context.on("response", _mark_changed)
+    changed.set()  # capture the state the browser opened with
+    try:
+        while True:
+            await changed.wait()
+            # Coalesce the burst of responses that accompanies each login step
+            await asyncio.sleep(MANUAL_AUTH_DEBOUNCE_S)
+            await _save()
+    finally:
+        await _save()
+
+
+async def _run_until_interrupted(coro: Coroutine[Any, Any, None]) -> None:
+    """Run ``coro`` until it finishes or SIGINT arrives, then cancel it cleanly.
+
+    Ctrl+C sets an event through a loop signal handler rather than raising
+    ``KeyboardInterrupt`` through the event loop, so the browser shuts down
+    through the normal ``async with`` exits. Where the loop cannot install
+    signal handlers (Windows), Ctrl+C keeps its default behaviour.
+    """
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    with contextlib.suppress(NotImplementedError):  # Windows event loops
+        loop.add_signal_handler(signal.SIGINT, stop.set)
+    task = asyncio.create_task(coro)
+    stopper = asyncio.create_task(stop.wait())
+    try:
+        await asyncio.wait((task, stopper), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        with contextlib.suppress(NotImplementedError):
+            loop.remove_signal_handler(signal.SIGINT)
+        stopper.cancel()
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
 @cli.command()
 @click.option("--interactive", is_flag=True, help="Prompt for secrets instead of env/keyring")
 @click.option(
@@ -106,32 +248,33 @@ def auth(interactive: bool, manual: bool) -> None:
     if manual:
 
         async def _manual():
-            async with CopilotController() as ctl:
+            async with _controller() as ctl:
                 assert ctl.page and ctl.context
                 await ctl.page.goto(settings.copilot_url)
-                console.print(
+                from rich.panel import Panel  # noqa: PLC0415
+
+                _console().print(
                     Panel.fit(
-                        "Headed browser opened. Complete login in the browser.\nThis process saves auth state periodically. Press Ctrl+C when done.",
+                        "Headed browser opened. Complete login in the browser.\nThis process saves auth state whenever it changes. Press Ctrl+C when done.",
                         title="Manual Auth",
                         style="cyan",
                     )
                 )
-                try:
-                    while True:
-                        await asyncio.sleep(5)
-                        await ctl.context.storage_state(path=str(settings.storage_state_path))
-                except asyncio.CancelledError:
-                    pass
+                await _run_until_interrupted(
+                    _save_storage_state_on_change(
+                        ctl.context, ctl.page, settings.storage_state_path
+                    )
+                )
 
-        try:
+        with contextlib.suppress(KeyboardInterrupt):
             run(_manual())
-        except KeyboardInterrupt:
-            console.print(
-                "[green]Stopped. Auth state saved to[/] [bold]playwright/auth/user.json[/]."
-            )
+        _console().print(
+            f"[green]Stopped. Auth state saved to[/] [bold]{settings.storage_state_path}[/]."
+        )
         return
 
     if interactive:
+        settings.hydrate_from_keyring()
         settings.username = click.prompt("Username", type=str, default=settings.username or "")
         settings.password = click.prompt(
             "Password", type=str, default=settings.password or "", hide_input=True
@@ -140,18 +283,18 @@ def auth(interactive: bool, manual: bool) -> None:
             settings.mfa_secret = click.prompt("MFA TOTP secret", type=str, hide_input=True)
 
     async def _run():
-        async with CopilotController() as ctl:
+        async with _controller() as ctl:
             await ctl.ensure_authenticated()
 
     run(_run())
-    console.print("[green]Authenticated.[/]")
+    _console().print("[green]Authenticated.[/]")
 
 
 @cli.command()
 @click.argument("prompt", type=str)
 @click.option(
     "--out",
-    type=click.Path(dir_okay=False, writable=True),
+    type=_OUT_PATH,
     default=None,
     help="Write response to file",
 )
@@ -160,32 +303,32 @@ def chat(prompt: str, out: str | None) -> None:
     _apply_overrides()
 
     async def _run():
-        async with CopilotController() as ctl:
+        async with _controller() as ctl:
             text = await ctl.chat(prompt)
             return text
 
-    with console.status("Contacting Copilot…", spinner="dots"):
+    with _status("Contacting Copilot…"):
         text = run(_run())
     if out:
-        Path(out).write_text(text)
-        console.print(f"[green]Wrote[/] {out}")
+        Path(out).write_text(text, encoding="utf-8")
+        _console().print(f"[green]Wrote[/] {out}")
     else:
-        console.print(Panel(Markdown(text), title="Copilot", border_style="green"))
+        _print_response(text)
 
 
 @cli.command(name="ask-with-file")
-@click.argument("file_path", type=click.Path(exists=True, dir_okay=False))
+@click.argument("file_path", type=_FILE_PATH)
 @click.argument("prompt", type=str)
 @click.option(
     "--out",
-    type=click.Path(dir_okay=False, writable=True),
+    type=_OUT_PATH,
     default=None,
     help="Write response to file",
 )
 @click.option("--download", is_flag=True, help="Wait for Copilot to offer a downloadable artifact")
 @click.option(
     "--download-dir",
-    type=click.Path(file_okay=False),
+    type=_DIR_PATH,
     default=None,
     help="Directory for downloaded files",
 )
@@ -208,10 +351,10 @@ def ask_with_file_cmd(
     settings = _apply_overrides()
     download_path = Path(download_dir) if download_dir else settings.output_directory
     if download:
-        download_path.mkdir(parents=True, exist_ok=True)
+        ensure_dir(download_path)
 
     async def _run():
-        async with CopilotController() as ctl:
+        async with _controller() as ctl:
             text = await ctl.ask_with_file(Path(file_path), prompt)
             artifact = None
             if download:
@@ -224,26 +367,24 @@ def ask_with_file_cmd(
                     artifact = None
             return text, artifact
 
-    with console.status("Uploading file and waiting for Copilot…", spinner="dots"):
+    with _status("Uploading file and waiting for Copilot…"):
         text, artifact = run(_run())
     if out:
-        Path(out).write_text(text)
-        console.print(f"[green]Wrote[/] {out}")
+        Path(out).write_text(text, encoding="utf-8")
+        _console().print(f"[green]Wrote[/] {out}")
     else:
-        console.print(Panel(Markdown(text), title="Copilot", border_style="green"))
+        _print_response(text)
     if download:
         if artifact:
-            console.print(f"[green]Downloaded[/] {artifact}")
+            _console().print(f"[green]Downloaded[/] {artifact}")
         else:
-            console.print(
+            _console().print(
                 "[yellow]Copilot did not provide a downloadable artifact within the timeout.[/]"
             )
 
 
 @cli.command()
-@click.option(
-    "--out", type=click.Path(file_okay=False), default=None, help="Directory to save the download"
-)
+@click.option("--out", type=_DIR_PATH, default=None, help="Directory to save the download")
 @click.option(
     "--timeout",
     type=int,
@@ -255,23 +396,25 @@ def download(out: str | None, timeout: int) -> None:
     """Download the next artifact offered in the current Copilot conversation."""
     settings = _apply_overrides()
     target_dir = Path(out) if out else settings.output_directory
-    target_dir.mkdir(parents=True, exist_ok=True)
+    ensure_dir(target_dir)
 
     async def _run():
-        async with CopilotController() as ctl:
+        async with _controller() as ctl:
             await ctl.ensure_authenticated()
             assert ctl.page
             await ctl.page.goto(settings.copilot_url)
+            from ..automation.ui import prepare_chat_ui  # noqa: PLC0415
+
             await prepare_chat_ui(ctl.page)
             return await ctl.download_response(target_dir, timeout_ms=timeout * 1000)
 
     try:
-        with console.status("Waiting for Copilot to provide a download…", spinner="dots"):
+        with _status("Waiting for Copilot to provide a download…"):
             path = run(_run())
     except RuntimeError as exc:
-        console.print(f"[red]Download failed:[/] {exc}")
+        _console().print(f"[red]Download failed:[/] {exc}")
         raise SystemExit(1)
-    console.print(f"[green]Downloaded[/] {path}")
+    _console().print(f"[green]Downloaded[/] {path}")
 
 
 if __name__ == "__main__":
@@ -99,5 +99,5 @@ def format_error_context(error: Exception, context: dict | None = None) -> str:
     if not context:
         return base_msg
 
-    context_str = ", ".join(f"{k}={v}" for k, v in context.items())
+    context_str = ", ".join([f"{k}={v}" for k, v in context.items()])
     return f"{base_msg} (Context: {context_str})"
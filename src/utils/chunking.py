@@ -4,6 +4,10 @@ from .logger import get_logger
 
 logger = get_logger(__name__)
 
+# Fixed wording appended to each part; only the part count varies per call
+_NONFINAL_TAIL = "\nDo not respond yet. Wait until you receive Part {total}/{total}."
+_FINAL_TAIL = "\nNow process all parts above as a single prompt."
+
 
 def _split_by_words(text: str, max_len: int) -> list[str]:
     """Split text into chunks not exceeding max_len, preserving word boundaries.
@@ -12,39 +16,42 @@ def _split_by_words(text: str, max_len: int) -> list[str]:
     """
     if max_len <= 0:
         return [text]
-    words = text.split()
     chunks: list[str] = []
     current: list[str] = []
     current_len = 0
 
-    def flush() -> None:
-        nonlocal current, current_len
-        if current:
-            chunks.append(" ".join(current))
-            current = []
-            current_len = 0
-
-    for word in words:
-        if len(word) > max_len:
-            flush()
-            start = 0
-            while start < len(word):
-                end = min(start + max_len, len(word))
-                chunks.append(word[start:end])
-                start = end
+    for word in text.split():
+        word_len = len(word)
+        if word_len > max_len:
+            if current:
+                chunks.append(" ".join(current))
+                current.clear()
+                current_len = 0
+            chunks.extend(word[start : start + max_len] for start in range(0, word_len, max_len))
             continue
-        projected = len(word) if not current else current_len + 1 + len(word)
-        if projected <= max_len:
-            current.append(word)
-            current_len = projected
+        if not current:
+            current_len = word_len
+        elif current_len + 1 + word_len <= max_len:
+            current_len += 1 + word_len
         else:
-            flush()
-            current.append(word)
-            current_len = len(word)
-    flush()
+            # Each chunk is joined exactly once, when it is full
+            chunks.append(" ".join(current))
+            current.clear()
+            current_len = word_len
+        current.append(word)
+    if current:
+        chunks.append(" ".join(current))
     return chunks if chunks else ([text] if text else [])
 
 
+def _single_message(text: str, instruction: str) -> str:
+    """Return ``text`` unchanged, or with ``instruction`` appended after a blank line."""
+    if not instruction:
+        return text
+    base = text.rstrip()
+    return f"{base}\n\n{instruction}" if base else instruction
+
+
 def build_copilot_chunk_messages(
     text: str,
     max_prompt_chars: int,
@@ -64,14 +71,10 @@ def build_copilot_chunk_messages(
     :returns: List of messages to send in order
     :rtype: list[str]
     """
+    # Strip the instruction once; every path below needs the stripped form
+    instruction = final_instruction.strip() if final_instruction else ""
     if max_prompt_chars <= 0 or len(text) <= max_prompt_chars:
-        # Single message path. Include final_instruction if provided.
-        if final_instruction and final_instruction.strip():
-            base = text.rstrip()
-            if base:
-                return [f"{base}\n\n{final_instruction.strip()}"]
-            return [final_instruction.strip()]
-        return [text]
+        return [_single_message(text, instruction)]
 
     # Reserve a conservative header budget so each message stays under the limit
     # even after we include "Part i/N" and short guidance lines.
@@ -81,30 +84,26 @@ def build_copilot_chunk_messages(
     payload_chunks = _split_by_words(text, payload_max)
     total = len(payload_chunks)
     if total <= 1:
-        if final_instruction and final_instruction.strip():
-            base = text.rstrip()
-            if base:
-                return [f"{base}\n\n{final_instruction.strip()}"]
-            return [final_instruction.strip()]
-        return [text]
+        return [_single_message(text, instruction)]
+
+    # Header suffixes and tails are identical for every non-final part, so
+    # build them once and only format the part number inside the loop. Chunks
+    # come from whitespace-split words and the tails end in text, so no
+    # stripping is needed when assembling messages.
+    nonfinal_head = f"/{total}]\n"
+    nonfinal_tail = _NONFINAL_TAIL.format(total=total)
+    final_tail = _FINAL_TAIL
+    if instruction:
+        final_tail = f"{final_tail}\n{instruction}"
 
     messages: list[str] = []
-    for idx, chunk in enumerate(payload_chunks, start=1):
-        is_final = idx == total
-        if is_final:
-            header = f"[Part {idx}/{total} - Final]"
-            tail_lines: list[str] = [
-                "Now process all parts above as a single prompt.",
-            ]
-            if final_instruction and final_instruction.strip():
-                tail_lines.append(final_instruction.strip())
+    append = messages.append
+    last = total - 1
+    for idx, chunk in enumerate(payload_chunks):
+        if idx == last:
+            message = f"[Part {total}/{total} - Final]\n{chunk}{final_tail}"
         else:
-            header = f"[Part {idx}/{total}]"
-            tail_lines = [
-                f"Do not respond yet. Wait until you receive Part {total}/{total}.",
-            ]
-
-        message = "\n".join([header, chunk.strip(), *tail_lines]).strip()
+            message = f"[Part {idx + 1}{nonfinal_head}{chunk}{nonfinal_tail}"
         if len(message) > max_prompt_chars:
             # As a last resort, hard-trim to respect platform limits.
             logger.debug(
@@ -113,5 +112,5 @@ def build_copilot_chunk_messages(
                 max_prompt_chars,
             )
             message = message[:max_prompt_chars]
-        messages.append(message)
+        append(message)
     return messages
@@ -1,15 +1,14 @@
 import json
 import os
-from functools import lru_cache
 from pathlib import Path
 
-import keyring
 from dotenv import load_dotenv
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from ..automation.constants import DEFAULT_MAX_PROMPT_CHARS
 from .logger import get_logger
+from .paths import ensure_dir
 
 load_dotenv(dotenv_path=Path(".env"), override=False)
 _logger = get_logger(__name__)
@@ -21,7 +20,9 @@ class Settings(BaseSettings):
     """Application settings loaded from env and keyring.
 
     Secrets precedence: environment variables first, then keyring (for
-    sensitive keys), otherwise remain ``None``.
+    sensitive keys), otherwise remain ``None``. Keyring lookups are slow on
+    some platforms, so they only happen once :meth:`hydrate_from_keyring` is
+    called by code that actually needs the secrets.
     """
 
     # Auth
@@ -37,6 +38,10 @@ class Settings(BaseSettings):
     )
     browser_executable_path: str | None = Field(default=os.getenv("BROWSER_EXECUTABLE_PATH"))
     browser_channel: str | None = Field(default=os.getenv("BROWSER_CHANNEL"))
+    browser_pool_size: int = Field(default=int(os.getenv("BROWSER_POOL_SIZE", "1")))
+    browser_pool_idle_timeout: float = Field(
+        default=float(os.getenv("BROWSER_POOL_IDLE_TIMEOUT", "300"))
+    )
 
     # Prompt behaviour
     force_markdown_responses: bool = Field(
@@ -57,19 +62,30 @@ class Settings(BaseSettings):
         populate_by_name=True, env_file=".env", env_file_encoding="utf-8", extra="ignore"
     )
 
+    _keyring_hydrated: bool = PrivateAttr(default=False)
+
     def hydrate_from_keyring(self) -> None:
-        """Fill missing sensitive values from OS keyring."""
-        secrets = {}
-        if _KEYRING_FILE.exists():
-            try:
-                secrets = json.loads(_KEYRING_FILE.read_text())
-            except Exception as exc:
-                _logger.warning("Failed to read local keyring file: %s", exc)
+        """Fill missing sensitive values from OS keyring (at most once per instance)."""
+        if self._keyring_hydrated:
+            return
+        self._keyring_hydrated = True
+        secrets: dict[str, str] = {}
+        try:
+            secrets = json.loads(_KEYRING_FILE.read_bytes())
+        except FileNotFoundError:
+            pass
+        except Exception as exc:
+            _logger.warning("Failed to read local keyring file: %s", exc)
 
         if not self.password:
             self.password = secrets.get("M365_PASSWORD")
         if not self.mfa_secret:
             self.mfa_secret = secrets.get("M365_OTP_SECRET")
+        if self.password and self.mfa_secret:
+            return
+
+        # Imported here: loading the keyring backend is slow and rarely needed
+        import keyring  # noqa: PLC0415
 
         if not self.password:
             try:
@@ -83,16 +99,23 @@ class Settings(BaseSettings):
                 _logger.debug("Keyring lookup for mfa_secret failed: %s", exc)
 
 
-@lru_cache(maxsize=1)
+_settings: Settings | None = None
+
+
 def get_settings() -> Settings:
-    """Return cached settings instance with keyring hydration."""
+    """Return cached settings instance; call ``hydrate_from_keyring`` for secrets."""
+    global _settings  # noqa: PLW0603 - process-wide singleton
+    settings = _settings
+    if settings is not None:
+        return settings
     settings = Settings()
-    settings.hydrate_from_keyring()
-    settings.output_directory.mkdir(parents=True, exist_ok=True)
-    settings.storage_state_path.parent.mkdir(parents=True, exist_ok=True)
+    ensure_dir(settings.output_directory)
+    ensure_dir(settings.storage_state_path.parent)
+    _settings = settings
     return settings
 
 
 def reset_settings_cache() -> None:
     """Clear the cached settings instance."""
-    get_settings.cache_clear()
+    global _settings  # noqa: PLW0603 - process-wide singleton
+    _settings = None
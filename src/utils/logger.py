@@ -1,28 +1,44 @@
 import logging
 import os
 
+_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _configure_root() -> logging.Logger:
+    """Attach the stdout handler to the package root logger exactly once."""
+    root = logging.getLogger(__name__.partition(".")[0])
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(fmt=_FORMAT, datefmt=_DATE_FORMAT))
+    root.addHandler(handler)
+    root.propagate = False
+    set_level(os.getenv("LOG_LEVEL", "INFO"), root)
+    return root
+
+
+def set_level(level_name: str, logger: logging.Logger | None = None) -> None:
+    """Change the level of the package root logger (and so every module logger).
+
+    :param level_name: Standard level name such as ``DEBUG``; unknown names map to INFO
+    :type level_name: str
+    :param logger: Logger to update, defaults to the package root
+    :type logger: logging.Logger | None
+    """
+    level = getattr(logging, level_name.upper(), logging.INFO)
+    (logger or _ROOT).setLevel(level)
+
+
+_ROOT = _configure_root()
+
 
 def get_logger(name: str | None = None) -> logging.Logger:
     """Return a configured logger.
 
     The logger writes to stdout with a concise format. Log level comes from
-    the ``LOG_LEVEL`` environment variable (default: INFO).
+    the ``LOG_LEVEL`` environment variable (default: INFO). Handler and level
+    live on the package root logger, so module loggers simply inherit them.
     """
-    logger = logging.getLogger(name if name else __name__)
-    if logger.handlers:
-        return logger
-
-    level_name = os.getenv("LOG_LEVEL", "INFO").upper()
-    level = getattr(logging, level_name, logging.INFO)
-
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter(
-        fmt="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-    handler.setFormatter(formatter)
-
-    logger.addHandler(handler)
-    logger.setLevel(level)
-    logger.propagate = False
-    return logger
+    name = name or __name__
+    if name == _ROOT.name or name.startswith(f"{_ROOT.name}."):
+        return logging.getLogger(name)
+    return _ROOT.getChild(name)
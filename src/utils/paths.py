@@ -0,0 +1,13 @@
+from pathlib import Path
+
+
+def ensure_dir(path: Path) -> Path:
+    """Create ``path`` and any missing parents.
+
+    :param path: Directory to create
+    :type path: Path
+    :returns: The same path, for chaining
+    :rtype: Path
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    return path
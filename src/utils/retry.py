@@ -6,14 +6,68 @@ UI timing problems, or temporary service unavailability.
 """
 
 import asyncio
+import inspect
+import logging
+import random
+import time
 from collections.abc import Callable
 from functools import wraps
-from typing import Any
+from typing import Any, Literal
 
 from .logger import get_logger
 
 logger = get_logger(__name__)
 
+JitterMode = Literal["none", "full", "equal"]
+WAIT_POLL_START_MS = 5  # First wait_for_condition poll interval
+
+
+def backoff_delay_ms(
+    attempt: int,
+    delay_ms: int,
+    *,
+    exponential_backoff: bool = True,
+    jitter: JitterMode = "full",
+    max_delay_ms: int = 30000,
+) -> float:
+    """Return the delay before retry ``attempt`` (0-based) in milliseconds.
+
+    The exponential base is capped first and jitter is applied afterwards, so
+    callers that reach the cap keep spreading out instead of converging on
+    the same delay.
+
+    :param attempt: Zero-based index of the attempt that just failed
+    :type attempt: int
+    :param delay_ms: Initial delay in milliseconds
+    :type delay_ms: int
+    :param exponential_backoff: Whether to double the delay on every attempt
+    :type exponential_backoff: bool
+    :param jitter: ``"full"`` picks uniformly from ``[0, base]``, ``"equal"``
+        from ``[base/2, base]``, ``"none"`` uses ``base`` as is
+    :type jitter: JitterMode
+    :param max_delay_ms: Upper bound applied to the base delay
+    :type max_delay_ms: int
+    :returns: Delay in milliseconds
+    :rtype: float
+    """
+    if exponential_backoff:
+        # Past bit_length(max_delay_ms) doublings the cap always wins, so stop
+        # growing the exponent there rather than building ever larger ints
+        base = min(max_delay_ms, delay_ms << min(attempt, max_delay_ms.bit_length()))
+    else:
+        base = min(max_delay_ms, delay_ms)
+    if jitter == "full":
+        return random.uniform(0, base)
+    if jitter == "equal":
+        half = base / 2
+        return half + random.uniform(0, half)
+    return base
+
+
+def _name_of(func: Callable[..., Any]) -> str:
+    """Return a printable name for ``func``; partials and callables lack ``__name__``."""
+    return getattr(func, "__name__", None) or repr(func)
+
 
 async def retry_async(
     func: Callable[..., Any],
@@ -22,6 +76,10 @@ async def retry_async(
     delay_ms: int = 1000,
     exponential_backoff: bool = True,
     retry_on: tuple[type[Exception], ...] = (Exception,),
+    jitter: JitterMode = "full",
+    max_delay_ms: int = 30000,
+    total_timeout_ms: float | None = None,
+    _func_name: str | None = None,
     **kwargs: Any,
 ) -> Any:
     """Retry an async function with configurable backoff.
@@ -37,6 +95,18 @@ async def retry_async(
     :type exponential_backoff: bool
     :param retry_on: Tuple of exception types to retry on
     :type retry_on: tuple[type[Exception], ...]
+    :param jitter: How to randomise each delay so that concurrent callers do
+        not retry in lockstep; see :func:`backoff_delay_ms`
+    :type jitter: JitterMode
+    :param max_delay_ms: Upper bound on the backoff before jitter, in milliseconds
+    :type max_delay_ms: int
+    :param total_timeout_ms: Budget for all attempts and backoff, measured from
+        the call; the last error is raised at once if the next backoff would
+        overrun it
+    :type total_timeout_ms: float | None
+    :param _func_name: Name used in log messages, precomputed by
+        :func:`retry_on_exception`; defaults to ``func.__name__``
+    :type _func_name: str | None
     :param kwargs: Keyword arguments for the function
     :returns: Result from the function
     :raises: The last exception if all retries fail
@@ -46,44 +116,63 @@ async def retry_async(
         ...     page.click,
         ...     "button",
         ...     max_retries=3,
-        ...     retry_on=(TimeoutError,)
+        ...     retry_on=(TimeoutError,),
+        ...     jitter="equal",
         ... )
     """
+    deadline_ms = None
+    if total_timeout_ms is not None:
+        deadline_ms = time.monotonic() * 1000 + total_timeout_ms
     last_exception = None
+    # A lone type is matched directly instead of through a one-element tuple
+    catch = retry_on[0] if len(retry_on) == 1 else retry_on
 
     for attempt in range(max_retries):
         try:
             return await func(*args, **kwargs)
-        except retry_on as exc:
+        except catch as exc:
             last_exception = exc
+            name = _func_name or _name_of(func)
             if attempt == max_retries - 1:
                 logger.warning(
                     "All %d retry attempts failed for %s",
                     max_retries,
-                    func.__name__,
+                    name,
                 )
                 raise
 
-            # Calculate delay with optional exponential backoff
-            current_delay = delay_ms
-            if exponential_backoff:
-                current_delay = delay_ms * (2**attempt)
-
-            logger.debug(
-                "Retry %d/%d for %s after %dms (error: %s)",
-                attempt + 1,
-                max_retries,
-                func.__name__,
-                current_delay,
-                type(exc).__name__,
+            current_delay = backoff_delay_ms(
+                attempt,
+                delay_ms,
+                exponential_backoff=exponential_backoff,
+                jitter=jitter,
+                max_delay_ms=max_delay_ms,
             )
+            if deadline_ms is not None and time.monotonic() * 1000 + current_delay > deadline_ms:
+                # The next attempt could not start before the deadline; fail now
+                logger.warning(
+                    "Retry deadline reached after %d attempt(s) for %s",
+                    attempt + 1,
+                    name,
+                )
+                raise
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Retry %d/%d for %s after %dms (error: %s)",
+                    attempt + 1,
+                    max_retries,
+                    name,
+                    current_delay,
+                    exc.__class__.__name__,
+                )
 
             await asyncio.sleep(current_delay / 1000)
 
     # Should never reach here, but just in case
     if last_exception:
         raise last_exception
-    raise RuntimeError(f"Retry logic failed for {func.__name__}")
+    raise RuntimeError(f"Retry logic failed for {_func_name or _name_of(func)}")
 
 
 def retry_on_exception(
@@ -91,6 +180,10 @@ def retry_on_exception(
     delay_ms: int = 1000,
     exponential_backoff: bool = True,
     retry_on: tuple[type[Exception], ...] = (Exception,),
+    *,
+    jitter: JitterMode = "full",
+    max_delay_ms: int = 30000,
+    total_timeout_ms: float | None = None,
 ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
     """Decorator to automatically retry async functions.
 
@@ -102,6 +195,12 @@ def retry_on_exception(
     :type exponential_backoff: bool
     :param retry_on: Tuple of exception types to retry on
     :type retry_on: tuple[type[Exception], ...]
+    :param jitter: Jitter mode, ``"full"``, ``"equal"`` or ``"none"``
+    :type jitter: JitterMode
+    :param max_delay_ms: Upper bound on the backoff before jitter, in milliseconds
+    :type max_delay_ms: int
+    :param total_timeout_ms: Budget for all attempts of one call, in milliseconds
+    :type total_timeout_ms: float | None
     :returns: Decorated function with retry logic
     :rtype: Callable
 
@@ -115,6 +214,8 @@ def retry_on_exception(
     """
 
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        name = _name_of(func)
+
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
             return await retry_async(
@@ -124,6 +225,10 @@ def retry_on_exception(
                 delay_ms=delay_ms,
                 exponential_backoff=exponential_backoff,
                 retry_on=retry_on,
+                jitter=jitter,
+                max_delay_ms=max_delay_ms,
+                total_timeout_ms=total_timeout_ms,
+                _func_name=name,
                 **kwargs,
             )
 
@@ -133,18 +238,19 @@ def retry_on_exception(
 
 
 async def wait_for_condition(
-    condition: Callable[[], bool],
+    condition: Callable[[], Any],
     timeout_ms: int = 10000,
     poll_interval_ms: int = 500,
     error_message: str = "Condition not met within timeout",
 ) -> None:
     """Wait for a condition to become true.
 
-    :param condition: Function that returns True when condition is met
-    :type condition: Callable[[], bool]
+    :param condition: Function (sync or async) that returns True when condition is met
+    :type condition: Callable[[], Any]
     :param timeout_ms: Maximum time to wait in milliseconds
     :type timeout_ms: int
-    :param poll_interval_ms: Time between checks in milliseconds
+    :param poll_interval_ms: Longest time between checks in milliseconds; the
+        interval starts small and doubles up to this value
     :type poll_interval_ms: int
     :param error_message: Error message if timeout occurs
     :type error_message: str
@@ -157,11 +263,16 @@ async def wait_for_condition(
         ...     error_message="Element not visible"
         ... )
     """
+    # Start with a tiny interval so fast conditions are seen almost at once,
+    # then double it up to poll_interval_ms for slow ones
+    step = min(WAIT_POLL_START_MS, poll_interval_ms)
+    is_coro = inspect.iscoroutinefunction(condition)
     elapsed = 0
     while elapsed < timeout_ms:
-        if await condition() if asyncio.iscoroutinefunction(condition) else condition():
+        if await condition() if is_coro else condition():
             return
-        await asyncio.sleep(poll_interval_ms / 1000)
-        elapsed += poll_interval_ms
+        await asyncio.sleep(step / 1000)
+        elapsed += step
+        step = min(step * 2, poll_interval_ms)
 
     raise TimeoutError(f"{error_message} (timeout: {timeout_ms}ms)")
@@ -0,0 +1,121 @@
+"""Shared test setup.
+
+Lightweight stand-ins are registered for third-party packages that are not
+installed, so the unit tests can import the application modules anywhere.
+``importlib.util.find_spec`` is used to probe for each package, which avoids
+raising and discarding an ``ImportError`` when the package is present.
+"""
+
+import importlib.util
+import sys
+import types
+
+
+def _playwright_stub() -> types.ModuleType:
+    playwright_module = types.ModuleType("playwright")
+    async_api_module = types.ModuleType("playwright.async_api")
+    async_api_module.async_playwright = lambda: None
+    for name in ("Browser", "BrowserContext", "Download", "Locator", "Page", "Request"):
+        setattr(async_api_module, name, object)
+    async_api_module.FilePayload = dict
+
+    class _DummyError(Exception):
+        pass
+
+    class _DummyTimeoutError(_DummyError):
+        pass
+
+    async_api_module.Error = _DummyError
+    async_api_module.TimeoutError = _DummyTimeoutError
+    sys.modules["playwright.async_api"] = async_api_module
+    playwright_module.async_api = async_api_module
+    return playwright_module
+
+
+def _pyotp_stub() -> types.ModuleType:
+    pyotp_module = types.ModuleType("pyotp")
+
+    class _DummyTOTP:
+        def __init__(self, secret):
+            self.secret = secret
+
+        def now(self):
+            return "000000"
+
+    pyotp_module.TOTP = _DummyTOTP
+    return pyotp_module
+
+
+def _keyring_stub() -> types.ModuleType:
+    keyring_module = types.ModuleType("keyring")
+
+    def _dummy_get_password(*args, **kwargs):
+        return None
+
+    keyring_module.get_password = _dummy_get_password
+    return keyring_module
+
+
+def _dotenv_stub() -> types.ModuleType:
+    dotenv_module = types.ModuleType("dotenv")
+
+    def _dummy_load_dotenv(*args, **kwargs):
+        return False
+
+    dotenv_module.load_dotenv = _dummy_load_dotenv
+    return dotenv_module
+
+
+def _pydantic_stub() -> types.ModuleType:
+    pydantic_module = types.ModuleType("pydantic")
+
+    class _DummyBaseModel:
+        model_config = {}
+
+        def __init__(self, **kwargs):
+            for name, value in self.__class__.__dict__.items():
+                if name.startswith("_") or callable(value):
+                    continue
+                setattr(self, name, value)
+            for key, value in kwargs.items():
+                setattr(self, key, value)
+
+    def _dummy_field(default=None, **_kwargs):
+        return default
+
+    class _DummyValidationError(ValueError):
+        pass
+
+    class _DummyConfigDict(dict):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+
+    pydantic_module.BaseModel = _DummyBaseModel
+    pydantic_module.Field = _dummy_field
+    pydantic_module.ConfigDict = _DummyConfigDict
+    pydantic_module.PrivateAttr = _dummy_field
+    pydantic_module.ValidationError = _DummyValidationError
+    return pydantic_module
+
+
+def _pydantic_settings_stub() -> types.ModuleType:
+    settings_module = types.ModuleType("pydantic_settings")
+    # Resolved lazily so the pydantic stand-in (or real pydantic) is used
+    pydantic_module = importlib.import_module("pydantic")
+    settings_module.BaseSettings = pydantic_module.BaseModel
+    settings_module.SettingsConfigDict = dict
+    return settings_module
+
+
+_STUBS = {
+    "playwright": _playwright_stub,
+    "pyotp": _pyotp_stub,
+    "keyring": _keyring_stub,
+    "dotenv": _dotenv_stub,
+    "pydantic": _pydantic_stub,
+    "pydantic_settings": _pydantic_settings_stub,
+}
+
+for _name, _build in _STUBS.items():
+    if _name not in sys.modules and importlib.util.find_spec(_name) is None:
+        sys.modules[_name] = _build()
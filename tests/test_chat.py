@@ -1,4 +1,106 @@
-from src.automation.chat import _filter_candidates, _normalise_response, _score
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.automation import chat as chat_module
+from src.automation.chat import (
+    _extract_raw_markdown,
+    _filter_candidates,
+    _normalise_response,
+    _score,
+    read_response_text,
+    send_prompt,
+)
+from src.automation.constants import MESSAGE_SELECTOR_UNION, RAW_MARKDOWN_SELECTORS
+
+
+class _DummyKeyboard:
+    def __init__(self) -> None:
+        self.pressed: list[str] = []
+
+    async def press(self, key: str) -> None:
+        self.pressed.append(key)
+
+
+class _DummyLocator:
+    def __init__(self, page, selector: str, matches: list[tuple[str, bool]] = ()) -> None:
+        self._page = page
+        self.selector = selector
+        # ``(selector, visible)`` of the buttons this locator matches, in page order
+        self.matches = list(matches)
+
+    def or_(self, other: "_DummyLocator"):
+        return _DummyLocator(self._page, self.selector, self.matches + other.matches)
+
+    @property
+    def first(self):
+        return _DummyLocator(self._page, self.selector, self.matches[:1])
+
+    async def wait_for(self, state: str = "visible", timeout: int = 0) -> None:
+        await asyncio.sleep(self._page.first_message_delay)
+
+    async def is_visible(self) -> bool:
+        # Only the stop button is probed for visibility
+        return self._page.stop_visible.pop(0) if self._page.stop_visible else False
+
+    async def evaluate_all(self, expression: str, arg=None) -> list:
+        self._page.queries.append(self.selector)
+        if self._page.finished_url:
+            request = SimpleNamespace(url=self._page.finished_url)
+            for handler in self._page.listeners.get("requestfinished", []):
+                handler(request)
+        if arg is None:
+            return list(self._page.messages.get(self.selector, []))
+        if expression is chat_module._RENDERED_TEXT_JS:
+            return self._page.rendered.get(arg)
+        rows = [
+            [message, ""] if isinstance(message, str) else list(message)
+            for message in self._page.messages.get(self.selector, [])
+        ]
+        return [[text, raw, self._page.rendered.get(text, text)] for text, raw in rows]
+
+    async def click(self, timeout: int = 0) -> None:
+        if not self.matches or not self.matches[0][1]:
+            raise TimeoutError(self.selector)
+        self._page.clicked.append(self.matches[0][0])
+
+
+class _DummyChatPage:
+    def __init__(
+        self, buttons=None, messages=None, finished_url=None, rendered=None, stop_visible=()
+    ) -> None:
+        # Successive visibility results for the stop button
+        self.stop_visible = list(stop_visible)
+        self.first_message_delay = 0.0
+        # Visibility of the elements each button selector matches
+        self.buttons: dict[str, list[bool]] = (
+            {'button[aria-label="Send"]': [True]} if buttons is None else buttons
+        )
+        self.rendered: dict[str, str] = rendered or {}
+        self.finished_url = finished_url
+        self.messages: dict[str, list[str]] = messages or {}
+        self.queries: list[str] = []
+        self.listeners: dict[str, list] = {}
+        self.filled: list[tuple[str, str]] = []
+        self.clicked: list[str] = []
+        self.keyboard = _DummyKeyboard()
+
+    async def fill(self, selector: str, value: str) -> None:
+        self.filled.append((selector, value))
+
+    def locator(self, selector: str) -> _DummyLocator:
+        base, _, engine = selector.partition(" >> ")
+        matches = [(sel, shown) for sel in base.split(", ") for shown in self.buttons.get(sel, ())]
+        if engine == "visible=true":
+            matches = [match for match in matches if match[1]]
+        return _DummyLocator(self, selector, matches)
+
+    def on(self, event: str, handler) -> None:
+        self.listeners.setdefault(event, []).append(handler)
+
+    def remove_listener(self, event: str, handler) -> None:
+        self.listeners[event].remove(handler)
 
 
 def test_filter_candidates_drops_noise_and_duplicates():
@@ -44,3 +146,164 @@ def test_normalise_response_decodes_entities_and_drops_citations():
     assert "## Heading without newline" in normalised
     assert "\n- First bullet" in normalised
     assert "\n- Second bullet" in normalised
+
+
+def test_normalise_response_decodes_named_and_hex_entities_in_plain_text():
+    raw = "Fish &amp; chips cost &pound;5 &#x2014; a bargain&#33;"
+
+    assert _normalise_response(raw) == "Fish & chips cost £5 — a bargain!"
+
+
+@pytest.mark.asyncio
+async def test_send_prompt_clicks_send_button():
+    page = _DummyChatPage()
+
+    await send_prompt(page, "Hello")
+
+    assert page.filled[0][1] == "Hello"
+    assert page.clicked == ['button[aria-label="Send"]']
+    assert page.keyboard.pressed == []
+
+
+@pytest.mark.asyncio
+async def test_send_prompt_skips_hidden_send_button_for_visible_one():
+    page = _DummyChatPage(
+        buttons={'button[aria-label="Send"]': [False], 'button[type="submit"]': [True]}
+    )
+
+    await send_prompt(page, "Hello")
+
+    assert page.clicked == ['button[type="submit"]']
+    assert page.keyboard.pressed == []
+
+
+@pytest.mark.asyncio
+async def test_send_prompt_falls_back_to_enter():
+    page = _DummyChatPage(buttons={})
+
+    await send_prompt(page, "Hello")
+
+    assert page.clicked == []
+    assert page.keyboard.pressed == ["Enter"]
+
+
+@pytest.mark.asyncio
+async def test_read_response_text_returns_stable_best_candidate(monkeypatch):
+    monkeypatch.setattr(chat_module, "RESPONSE_STABLE_MS", 600)
+    page = _DummyChatPage(
+        messages={
+            MESSAGE_SELECTOR_UNION: [
+                "Summarise the report",
+                "Copilot said # Summary - Point one - Point two",
+            ]
+        },
+        rendered={
+            "Copilot said # Summary - Point one - Point two": (
+                "Copilot said # Summary\n- Point one\n- Point two"
+            )
+        },
+    )
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    text = await read_response_text(page, timeout_ms=10_000, exclude_text="Summarise the report")
+
+    # Stability is measured in wall-clock time, not in poll ticks
+    assert loop.time() - started >= 0.6
+    assert text == "# Summary\n- Point one\n- Point two"
+    assert set(page.queries) == {MESSAGE_SELECTOR_UNION}
+    assert page.listeners == {"requestfinished": []}
+
+
+@pytest.mark.asyncio
+async def test_read_response_text_returns_once_stop_button_disappears():
+    page = _DummyChatPage(
+        messages={MESSAGE_SELECTOR_UNION: ["Partial but complete answer"]},
+        finished_url="https://copilot.test/c/api/chathub",
+        stop_visible=[True],
+    )
+
+    text = await read_response_text(page, timeout_ms=10_000)
+
+    assert text == "Partial but complete answer"
+    # A streaming poll, a finished poll, then one read of the rendered text
+    assert page.queries == [MESSAGE_SELECTOR_UNION] * 3
+
+
+@pytest.mark.asyncio
+async def test_read_response_text_does_not_treat_stream_request_as_completion(monkeypatch):
+    monkeypatch.setattr(chat_module, "RESPONSE_STABLE_MS", 300)
+    page = _DummyChatPage(
+        messages={MESSAGE_SELECTOR_UNION: ["Stale answer"]},
+        finished_url="https://copilot.test/c/api/chathub",
+    )
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await read_response_text(page, timeout_ms=10_000)
+
+    # Without a stop button the answer must still hold for the stable window
+    assert loop.time() - started >= 0.3
+
+
+@pytest.mark.asyncio
+async def test_read_response_text_shares_one_timeout_across_both_waits():
+    page = _DummyChatPage(messages={MESSAGE_SELECTOR_UNION: ["Still streaming"]})
+    page.first_message_delay = 0.3
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await read_response_text(page, timeout_ms=400)
+
+    # The first-message wait uses up most of the budget; polling gets the rest
+    assert loop.time() - started < 0.6
+
+
+def test_response_stream_pattern_ignores_negotiate_handshake():
+    pattern = chat_module.RESPONSE_STREAM_URL_PATTERN
+
+    assert pattern.search("https://copilot.test/c/api/chathub?id=1")
+    assert not pattern.search("https://copilot.test/c/api/chathub/negotiate?v=1")
+
+
+@pytest.mark.asyncio
+async def test_read_response_text_ranks_candidates_by_rendered_line_structure():
+    listed = "Steps First step Second step"
+    prose = "A plain paragraph without any list structure. " * 10
+    page = _DummyChatPage(
+        messages={MESSAGE_SELECTOR_UNION: [listed, prose]},
+        rendered={listed: "Steps:\n- First step\n- Second step"},
+        stop_visible=[True],
+    )
+
+    text = await read_response_text(page, timeout_ms=10_000)
+
+    # Flattened textContent would rank the longer prose first
+    assert _score(prose) > _score(listed)
+    assert text == "Steps:\n- First step\n- Second step"
+
+
+@pytest.mark.asyncio
+async def test_read_response_text_uses_raw_markdown_from_winning_message():
+    page = _DummyChatPage(
+        messages={MESSAGE_SELECTOR_UNION: [("Rendered answer", "**Raw** answer")]},
+        stop_visible=[True],
+    )
+
+    text = await read_response_text(page, timeout_ms=10_000, normalise=False)
+
+    assert text == "**Raw** answer"
+    assert set(page.queries) == {MESSAGE_SELECTOR_UNION}
+
+
+@pytest.mark.asyncio
+async def test_extract_raw_markdown_prefers_earlier_selectors():
+    page = _DummyChatPage(
+        messages={
+            RAW_MARKDOWN_SELECTORS[0]: ["first block", "latest block"],
+            RAW_MARKDOWN_SELECTORS[-1]: ["fallback block"],
+        }
+    )
+
+    assert await _extract_raw_markdown(page) == "latest block"
+    assert sorted(page.queries) == sorted(RAW_MARKDOWN_SELECTORS)
@@ -0,0 +1,31 @@
+import pytest
+
+from src.utils.chunking import _split_by_words, build_copilot_chunk_messages
+
+
+@pytest.mark.parametrize(
+    ("text", "max_len", "expected"),
+    [
+        ("alpha beta gamma", 10, ["alpha beta", "gamma"]),
+        ("one  two\nthree", 100, ["one two three"]),
+        ("ab abcdefgh cd", 3, ["ab", "abc", "def", "gh", "cd"]),
+        ("", 5, []),
+        ("keep as is", 0, ["keep as is"]),
+    ],
+)
+def test_split_by_words(text, max_len, expected):
+    assert _split_by_words(text, max_len) == expected
+
+
+def test_build_copilot_chunk_messages_labels_parts_and_respects_limit():
+    text = " ".join(f"word{i}" for i in range(200))
+
+    messages = build_copilot_chunk_messages(text, 400, final_instruction="Reply in Markdown.")
+
+    total = len(messages)
+    assert total > 1
+    assert all(len(message) <= 400 for message in messages)
+    assert messages[0].startswith(f"[Part 1/{total}]\n")
+    assert messages[0].endswith(f"Wait until you receive Part {total}/{total}.")
+    assert messages[-1].startswith(f"[Part {total}/{total} - Final]\n")
+    assert messages[-1].endswith("Reply in Markdown.")
@@ -1,11 +1,158 @@
+import asyncio
+import json
+import os
+import signal
+
+import pytest
 from click.testing import CliRunner
 
-from src.cli.main import cli
+from src.cli import main as cli_module
+from src.cli.main import cli, run
 
 
 def test_cli_registers_expected_commands():
-    runner = CliRunner()
-    result = runner.invoke(cli, ["--help"])
-    assert result.exit_code == 0
     for command in ("chat", "ask-with-file", "download", "auth"):
         assert command in cli.commands
+
+
+def test_run_drives_coroutine_to_completion():
+    async def _answer():
+        return 42
+
+    assert run(_answer()) == 42
+
+
+class _EventSource:
+    def __init__(self) -> None:
+        self.handlers = {}
+
+    def on(self, event, handler) -> None:
+        self.handlers[event] = handler
+
+
+class _StatefulContext(_EventSource):
+    def __init__(self) -> None:
+        super().__init__()
+        self.state = {"cookies": [], "origins": []}
+        self.snapshots = 0
+
+    async def storage_state(self):
+        self.snapshots += 1
+        return self.state
+
+
+class _RecordingPath:
+    def __init__(self) -> None:
+        self.writes: list[bytes] = []
+
+    def write_bytes(self, data: bytes) -> None:
+        self.writes.append(data)
+
+
+async def _until(condition) -> None:
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("condition not reached")
+
+
+def test_manual_auth_saves_state_only_when_it_changes(monkeypatch):
+    monkeypatch.setattr(cli_module, "MANUAL_AUTH_DEBOUNCE_S", 0)
+    context, page, path = _StatefulContext(), _EventSource(), _RecordingPath()
+
+    async def run_saver():
+        task = asyncio.create_task(cli_module._save_storage_state_on_change(context, page, path))
+        await _until(lambda: len(path.writes) == 1)
+        context.handlers["response"](object())  # same state: snapshot but no rewrite
+        await _until(lambda: context.snapshots == 2)
+        context.state = {"cookies": [{"name": "auth"}], "origins": []}
+        page.handlers["framenavigated"](object())
+        await _until(lambda: len(path.writes) == 2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run_saver())
+
+    assert context.snapshots == 4  # the last one is the final snapshot on cancel
+    assert len(path.writes) == 2
+    assert json.loads(path.writes[0]) == {"cookies": [], "origins": []}
+    assert json.loads(path.writes[1])["cookies"] == [{"name": "auth"}]
+
+
+def test_manual_auth_saves_pending_change_on_cancel(monkeypatch):
+    monkeypatch.setattr(cli_module, "MANUAL_AUTH_DEBOUNCE_S", 60)
+    context, page, path = _StatefulContext(), _EventSource(), _RecordingPath()
+
+    async def run_saver():
+        task = asyncio.create_task(cli_module._save_storage_state_on_change(context, page, path))
+        await asyncio.sleep(0.01)  # parked in the debounce sleep
+        context.state = {"cookies": [{"name": "auth"}], "origins": []}
+        page.handlers["framenavigated"](object())
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run_saver())
+
+    assert len(path.writes) == 1
+    assert json.loads(path.writes[0])["cookies"] == [{"name": "auth"}]
+
+
+def test_manual_auth_skips_final_write_when_state_is_unchanged(monkeypatch):
+    monkeypatch.setattr(cli_module, "MANUAL_AUTH_DEBOUNCE_S", 0)
+    context, page, path = _StatefulContext(), _EventSource(), _RecordingPath()
+
+    async def run_saver():
+        task = asyncio.create_task(cli_module._save_storage_state_on_change(context, page, path))
+        await _until(lambda: len(path.writes) == 1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run_saver())
+
+    assert context.snapshots == 2
+    assert len(path.writes) == 1
+
+
+def test_sigint_cancels_manual_auth_watcher_cleanly():
+    cancelled = []
+
+    async def watch_forever():
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def interrupt_soon():
+        asyncio.get_running_loop().call_later(0.01, os.kill, os.getpid(), signal.SIGINT)
+        await cli_module._run_until_interrupted(watch_forever())
+
+    asyncio.run(interrupt_soon())
+
+    assert cancelled == [True]
+    assert signal.getsignal(signal.SIGINT) is signal.default_int_handler
+
+
+def test_piped_chat_skips_spinner_and_markdown_rendering(monkeypatch):
+    class _Controller:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def chat(self, prompt):
+            return f"# Echo\n\n{prompt}"
+
+    monkeypatch.setattr(cli_module, "_apply_overrides", lambda: None)
+    monkeypatch.setattr(cli_module, "_controller", _Controller)
+    monkeypatch.setattr(cli_module, "_console", lambda: pytest.fail("rich console used"))
+
+    result = CliRunner().invoke(cli, ["chat", "hello"])
+
+    assert result.exit_code == 0, result.output
+    assert result.output == "# Echo\n\nhello\n"
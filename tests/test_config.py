@@ -0,0 +1,45 @@
+import keyring
+import pydantic
+import pytest
+from pydantic import ValidationError
+
+from src.utils import config as config_module
+
+
+def test_keyring_is_only_consulted_on_demand_and_once(monkeypatch, tmp_path):
+    lookups = []
+
+    def _get_password(service, key):
+        lookups.append(key)
+        return f"from-keyring-{key}"
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("M365_PASSWORD", raising=False)
+    monkeypatch.delenv("M365_OTP_SECRET", raising=False)
+    monkeypatch.setattr(keyring, "get_password", _get_password)
+    config_module.reset_settings_cache()
+    try:
+        settings = config_module.get_settings()
+        assert lookups == []
+
+        settings.hydrate_from_keyring()
+        settings.hydrate_from_keyring()
+
+        assert lookups == ["M365_PASSWORD", "M365_OTP_SECRET"]
+        assert settings.password == "from-keyring-M365_PASSWORD"
+    finally:
+        config_module.reset_settings_cache()
+
+
+@pytest.mark.skipif(
+    not hasattr(pydantic, "VERSION"), reason="needs real pydantic validation, not the stand-in"
+)
+def test_get_settings_reports_validation_errors(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("BROWSER_HEADLESS", "sometimes")
+    config_module.reset_settings_cache()
+    try:
+        with pytest.raises(ValidationError, match="browser_headless"):
+            config_module.get_settings()
+    finally:
+        config_module.reset_settings_cache()
@@ -1,134 +1,60 @@
 import asyncio
-import sys
-import types
 from pathlib import Path
-from types import SimpleNamespace
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import AsyncMock
 
 import pytest
 
-try:
-    import playwright.async_api  # type: ignore[attr-defined]
-except ModuleNotFoundError:  # pragma: no cover - fallback for test environment
-    playwright_module = types.ModuleType("playwright")
-    async_api_module = types.ModuleType("playwright.async_api")
-    async_api_module.async_playwright = lambda: None
-    async_api_module.Browser = object
-    async_api_module.BrowserContext = object
-    async_api_module.Page = object
-    async_api_module.TimeoutError = Exception
-    sys.modules.setdefault("playwright", playwright_module)
-    sys.modules["playwright.async_api"] = async_api_module
-    playwright_module.async_api = async_api_module
-
-try:
-    import pyotp  # type: ignore[attr-defined]
-except ModuleNotFoundError:  # pragma: no cover - fallback for test environment
-    pyotp_module = types.ModuleType("pyotp")
-
-    class _DummyTOTP:
-        def __init__(self, secret):
-            self.secret = secret
-
-        def now(self):
-            return "000000"
-
-    pyotp_module.TOTP = _DummyTOTP
-    sys.modules["pyotp"] = pyotp_module
-
-try:
-    import keyring  # type: ignore[attr-defined]
-except ModuleNotFoundError:  # pragma: no cover - fallback for test environment
-    keyring_module = types.ModuleType("keyring")
-
-    def _dummy_get_password(*args, **kwargs):
-        return None
-
-    keyring_module.get_password = _dummy_get_password
-    sys.modules["keyring"] = keyring_module
-
-try:
-    from dotenv import load_dotenv  # type: ignore[attr-defined]
-except ModuleNotFoundError:  # pragma: no cover - fallback for test environment
-    dotenv_module = types.ModuleType("dotenv")
-
-    def _dummy_load_dotenv(*args, **kwargs):
-        return False
-
-    dotenv_module.load_dotenv = _dummy_load_dotenv
-    sys.modules["dotenv"] = dotenv_module
-    load_dotenv = _dummy_load_dotenv
-
-try:
-    from pydantic import BaseModel, ConfigDict, Field  # type: ignore[attr-defined]
-except ModuleNotFoundError:  # pragma: no cover - fallback for test environment
-    pydantic_module = types.ModuleType("pydantic")
-
-    class _DummyBaseModel:
-        model_config = {}
-
-        def __init__(self, **kwargs):
-            for name, value in self.__class__.__dict__.items():
-                if name.startswith("_") or callable(value):
-                    continue
-                setattr(self, name, value)
-            for key, value in kwargs.items():
-                setattr(self, key, value)
-
-    def _dummy_field(default=None, **_kwargs):
-        return default
-
-    class _DummyConfigDict(dict):
-        def __init__(self, **kwargs):
-            super().__init__(**kwargs)
-
-    pydantic_module.BaseModel = _DummyBaseModel
-    pydantic_module.Field = _dummy_field
-    pydantic_module.ConfigDict = _DummyConfigDict
-    sys.modules["pydantic"] = pydantic_module
-
 import src.automation.copilot_controller as copilot_module
-from src.automation.constants import MARKDOWN_INSTRUCTION
+from src.automation.constants import (
+    LOGGED_IN_INDICATORS,
+    MARKDOWN_INSTRUCTION,
+    MESSAGE_SELECTOR_UNION,
+    NEW_CHAT_SELECTOR_UNION,
+    PROMPT_INPUT_SELECTOR,
+    SIGN_IN_SELECTORS,
+)
 from src.automation.copilot_controller import CopilotController
 
 
-class AsyncSpy:
-    def __init__(self, return_value=None) -> None:
-        self.return_value = return_value
-        self.calls = []
-
-    async def __call__(self, *args, **kwargs):
-        self.calls.append((args, kwargs))
-        return self.return_value
-
-    def assert_called_once_with(self, *args, **kwargs) -> None:
-        assert len(self.calls) == 1
-        call_args, call_kwargs = self.calls[0]
-        assert call_args == args
-        assert call_kwargs == kwargs
-
-    def assert_not_called(self) -> None:
-        assert not self.calls
-
-
 class DummyPage:
+    __slots__ = ("closed", "goto_urls", "locator_counts", "url")
+
     def __init__(self) -> None:
         self.goto_urls = []
+        self.url = "about:blank"
         self.closed = False
+        self.locator_counts: dict[str, int] = {}
 
     async def goto(self, url: str) -> None:
         self.goto_urls.append(url)
+        self.url = url
 
     async def wait_for_load_state(self, state: str) -> None:
         pass
 
+    def locator(self, selector: str):
+        count = self.locator_counts.get(selector, 0)
+
+        class _Counted:
+            async def count(self) -> int:
+                return count
+
+        return _Counted()
+
     async def is_visible(self, selector: str, timeout: int = 0) -> bool:
         return False
 
     async def close(self) -> None:
         self.closed = True
 
+    def is_closed(self) -> bool:
+        return self.closed
+
 
 class DummyContext:
+    __slots__ = ("closed", "new_page_calls", "page")
+
     def __init__(self, page: DummyPage) -> None:
         self.page = page
         self.closed = False
@@ -143,6 +69,8 @@ class DummyContext:
 
 
 class DummyBrowser:
+    __slots__ = ("closed", "context", "storage_args")
+
     def __init__(self, context: DummyContext) -> None:
         self.context = context
         self.closed = False
@@ -157,6 +85,8 @@ class DummyBrowser:
 
 
 class DummyChromium:
+    __slots__ = ("browser", "launch_args")
+
     def __init__(self, browser: DummyBrowser) -> None:
         self.browser = browser
         self.launch_args = []
@@ -167,6 +97,8 @@ class DummyChromium:
 
 
 class DummyPlaywright:
+    __slots__ = ("chromium", "stopped")
+
     def __init__(self, chromium: DummyChromium) -> None:
         self.chromium = chromium
         self.stopped = False
@@ -176,6 +108,8 @@ class DummyPlaywright:
 
 
 class DummyPlaywrightManager:
+    __slots__ = ("playwright",)
+
     def __init__(self, playwright: DummyPlaywright) -> None:
         self.playwright = playwright
 
@@ -196,329 +130,509 @@ async def _stub_logged_in(self, page):
     return True
 
 
+# Coroutine tests in this module share one event loop instead of building
+# and tearing down a fresh loop per test
+on_module_loop = pytest.mark.asyncio(loop_scope="module")
+
+_BASE_SETTINGS = MappingProxyType(
+    {
+        "browser_headless": True,
+        "copilot_url": "https://copilot.test",
+        "username": "user@example.com",
+        "password": "super-secret",
+        "mfa_secret": None,
+        "force_markdown_responses": False,
+        "normalize_markdown": True,
+        "hydrate_from_keyring": lambda: None,
+    }
+)
+
+
 @pytest.fixture
 def make_settings(tmp_path):
     def factory(**overrides):
-        storage_state_path = overrides.pop("storage_state_path", tmp_path / "state.json")
-        storage_state_path = Path(storage_state_path)
+        storage_state_path = Path(overrides.pop("storage_state_path", tmp_path / "state.json"))
         storage_state_path.parent.mkdir(parents=True, exist_ok=True)
-        data = {
-            "browser_headless": True,
-            "storage_state_path": storage_state_path,
-            "copilot_url": "https://copilot.test",
-            "username": "user@example.com",
-            "password": "super-secret",
-            "mfa_secret": None,
-            "force_markdown_responses": False,
-            "normalize_markdown": True,
-        }
-        data.update(overrides)
-        return SimpleNamespace(**data)
+        return SimpleNamespace(
+            **{**_BASE_SETTINGS, "storage_state_path": storage_state_path, **overrides}
+        )
 
     return factory
 
 
-def test_start_initialises_playwright_stack(monkeypatch, make_settings):
-    async def run():
-        settings = make_settings(browser_headless=False)
-        page = DummyPage()
-        manager, browser, context, chromium, playwright = build_playwright_stack(page)
+@on_module_loop
+async def test_start_initialises_playwright_stack(monkeypatch, make_settings):
+    settings = make_settings(browser_headless=False)
+    page = DummyPage()
+    manager, browser, context, chromium, playwright = build_playwright_stack(page)
 
-        monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
-        monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
+    monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
+    monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
 
-        controller = CopilotController()
+    controller = CopilotController()
 
-        await controller.start()
+    await controller.start()
 
-        assert controller._playwright is playwright
-        assert controller.browser is browser
-        assert controller.context is context
-        assert controller.page is page
-        assert chromium.launch_args == [settings.browser_headless]
+    assert controller._playwright is playwright
+    assert controller.browser is browser
+    assert controller.context is context
+    assert controller.page is page
+    assert chromium.launch_args == [settings.browser_headless]
 
-        await controller.close()
+    await controller.close()
 
-    asyncio.run(run())
 
+@on_module_loop
+async def test_controllers_share_browser_until_last_close(monkeypatch, make_settings):
+    settings = make_settings()
+    page = DummyPage()
+    manager, browser, _, chromium, playwright = build_playwright_stack(page)
 
-def test_ensure_authenticated_requires_start(monkeypatch, make_settings):
-    async def run():
-        settings = make_settings()
-        monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
+    monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
+    monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
 
-        controller = CopilotController()
+    first, second = CopilotController(), CopilotController()
+    await asyncio.gather(first.start(), second.start())
 
-        with pytest.raises(RuntimeError, match="Controller not started"):
-            await controller.ensure_authenticated()
+    assert first.browser is second.browser is browser
+    assert len(chromium.launch_args) == 1
 
-    asyncio.run(run())
+    await first.close()
+    await first.close()
+    assert not browser.closed
+    assert first.browser is None
+    await second.close()
+    assert browser.closed
+    assert playwright.stopped
 
 
-def test_ensure_authenticated_refreshes_when_session_invalid(monkeypatch, make_settings):
-    async def run():
-        settings = make_settings()
-        settings.storage_state_path.write_text("{}")
+def test_controllers_on_separate_loops_do_not_share_browser(monkeypatch, make_settings):
+    settings = make_settings()
+    page = DummyPage()
+    manager, _, _, chromium, _ = build_playwright_stack(page)
 
-        page = DummyPage()
-        manager, browser, context, _, _ = build_playwright_stack(page)
+    monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
+    monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
+
+    async def _open(close: bool):
+        controller = CopilotController()
+        await controller.start()
+        if close:
+            await controller.close()
 
-        perform_login_mock = AsyncSpy()
+    asyncio.run(_open(close=True))
+    # A controller left open on a finished loop must not leak into the next one
+    asyncio.run(_open(close=False))
+    asyncio.run(_open(close=True))
 
-        monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
-        monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
-        monkeypatch.setattr(copilot_module, "perform_login", perform_login_mock)
+    assert len(chromium.launch_args) == 3
 
-        async def _force_not_logged(_: CopilotController, __: DummyPage) -> bool:
-            return False
 
-        monkeypatch.setattr(CopilotController, "_check_if_logged_in", _force_not_logged)
+@on_module_loop
+async def test_ensure_authenticated_requires_start(monkeypatch, make_settings):
+    settings = make_settings()
+    monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
 
-        controller = CopilotController()
-        await controller.start()
+    controller = CopilotController()
 
+    with pytest.raises(RuntimeError, match="Controller not started"):
         await controller.ensure_authenticated()
 
-        perform_login_mock.assert_called_once_with(
-            controller.context,
-            username=settings.username,
-            password=settings.password,
-            mfa_secret=settings.mfa_secret,
-        )
 
-        await controller.close()
+@on_module_loop
+async def test_ensure_authenticated_refreshes_when_session_invalid(monkeypatch, make_settings):
+    settings = make_settings()
+    settings.storage_state_path.write_text("{}")
 
-    asyncio.run(run())
+    page = DummyPage()
+    manager, browser, context, _, _ = build_playwright_stack(page)
 
+    perform_login_mock = AsyncMock()
 
-def test_chat_sends_prompt_and_returns_response(monkeypatch, make_settings):
-    async def run():
-        settings = make_settings()
-        settings.storage_state_path.write_text("{}")
+    monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
+    monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
+    monkeypatch.setattr(copilot_module, "perform_login", perform_login_mock)
 
-        page = DummyPage()
-        manager, browser, context, _, _ = build_playwright_stack(page)
+    async def _force_not_logged(_: CopilotController, __: DummyPage) -> bool:
+        return False
 
-        perform_login_mock = AsyncSpy()
-        prepare_mock = AsyncSpy()
-        send_mock = AsyncSpy()
-        read_mock = AsyncSpy(return_value="generated answer")
+    monkeypatch.setattr(CopilotController, "_check_if_logged_in", _force_not_logged)
 
-        monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
-        monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
-        monkeypatch.setattr(copilot_module, "perform_login", perform_login_mock)
-        monkeypatch.setattr(copilot_module, "prepare_chat_ui", prepare_mock)
-        monkeypatch.setattr(copilot_module, "_send_prompt", send_mock)
-        monkeypatch.setattr(copilot_module, "_read_response_text", read_mock)
-        monkeypatch.setattr(CopilotController, "_check_if_logged_in", _stub_logged_in)
+    controller = CopilotController()
+    await controller.start()
 
-        controller = CopilotController()
-        await controller.start()
+    await controller.ensure_authenticated()
 
-        prompt = "Summarise the quarterly report"
-        result = await controller.chat(prompt)
+    perform_login_mock.assert_awaited_once_with(
+        controller.context,
+        username=settings.username,
+        password=settings.password,
+        mfa_secret=settings.mfa_secret,
+    )
 
-        assert result == "generated answer"
-        prepare_mock.assert_called_once_with(page)
-        send_mock.assert_called_once_with(page, prompt)
-        read_mock.assert_called_once_with(
-            page, exclude_text=prompt, normalise=settings.normalize_markdown
-        )
-        perform_login_mock.assert_not_called()
+    await controller.close()
 
-        await controller.close()
 
-    asyncio.run(run())
+@on_module_loop
+async def test_ensure_authenticated_caches_result(monkeypatch, make_settings):
+    settings = make_settings()
+    settings.storage_state_path.write_text("{}")
 
+    page = DummyPage()
+    manager, *_ = build_playwright_stack(page)
 
-def test_chat_appends_markdown_instruction_when_enabled(monkeypatch, make_settings):
-    async def run():
-        settings = make_settings(force_markdown_responses=True)
-        settings.storage_state_path.write_text("{}")
+    monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
+    monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
+    monkeypatch.setattr(CopilotController, "_check_if_logged_in", _stub_logged_in)
 
-        page = DummyPage()
-        manager, browser, context, _, _ = build_playwright_stack(page)
+    controller = CopilotController()
+    await controller.start()
 
-        prepare_mock = AsyncSpy()
-        send_mock = AsyncSpy()
-        read_mock = AsyncSpy(return_value="generated answer")
+    await controller.ensure_authenticated()
+    await controller.ensure_authenticated()
 
-        monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
-        monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
-        monkeypatch.setattr(copilot_module, "prepare_chat_ui", prepare_mock)
-        monkeypatch.setattr(copilot_module, "_send_prompt", send_mock)
-        monkeypatch.setattr(copilot_module, "_read_response_text", read_mock)
-        monkeypatch.setattr(CopilotController, "_check_if_logged_in", _stub_logged_in)
+    assert page.goto_urls == [settings.copilot_url]
 
-        controller = CopilotController()
-        await controller.start()
+    await controller.close()
 
-        prompt = "Summarise the quarterly report"
-        decorated = f"{prompt}\n\n{MARKDOWN_INSTRUCTION}"
 
-        await controller.chat(prompt)
+@on_module_loop
+async def test_chat_reauthenticates_after_login_redirect(monkeypatch, make_settings):
+    settings = make_settings()
+    settings.storage_state_path.write_text("{}")
 
-        send_mock.assert_called_once_with(page, decorated)
-        read_mock.assert_called_once_with(
-            page, exclude_text=decorated, normalise=settings.normalize_markdown
-        )
+    class _RedirectingPage(DummyPage):
+        __slots__ = ()
 
-        await controller.close()
+        async def goto(self, url: str) -> None:
+            self.goto_urls.append(url)
+            self.url = "https://login.microsoftonline.com/" if len(self.goto_urls) == 2 else url
 
-    asyncio.run(run())
+    page = _RedirectingPage()
+    manager, *_ = build_playwright_stack(page)
+    checks = []
 
+    async def _check(_: CopilotController, __: DummyPage) -> bool:
+        checks.append(page.url)
+        return True
 
-def test_chat_uses_raw_response_when_normalise_disabled(monkeypatch, make_settings):
-    async def run():
-        settings = make_settings(force_markdown_responses=True, normalize_markdown=False)
-        settings.storage_state_path.write_text("{}")
+    monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
+    monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
+    monkeypatch.setattr(CopilotController, "_check_if_logged_in", _check)
+    monkeypatch.setattr(copilot_module, "prepare_chat_ui", AsyncMock())
+    monkeypatch.setattr(copilot_module, "_send_prompt", AsyncMock())
+    monkeypatch.setattr(copilot_module, "_read_response_text", AsyncMock(return_value="ok"))
 
-        page = DummyPage()
-        manager, browser, context, _, _ = build_playwright_stack(page)
+    controller = CopilotController()
+    await controller.start()
+    await controller.ensure_authenticated()
 
-        prepare_mock = AsyncSpy()
-        send_mock = AsyncSpy()
-        read_mock = AsyncSpy(return_value="raw answer")
+    assert await controller.chat("hi") == "ok"
+    assert len(checks) == 2
+    assert page.url == settings.copilot_url
 
-        monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
-        monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
-        monkeypatch.setattr(copilot_module, "prepare_chat_ui", prepare_mock)
-        monkeypatch.setattr(copilot_module, "_send_prompt", send_mock)
-        monkeypatch.setattr(copilot_module, "_read_response_text", read_mock)
-        monkeypatch.setattr(CopilotController, "_check_if_logged_in", _stub_logged_in)
+    await controller.close()
 
-        controller = CopilotController()
-        await controller.start()
 
-        prompt = "Summarise the quarterly report"
-        decorated = f"{prompt}\n\n{MARKDOWN_INSTRUCTION}"
+@pytest.mark.parametrize(("messages", "expected_loads"), [(0, 1), (2, 2)])
+@on_module_loop
+async def test_chat_reuses_fresh_copilot_page(monkeypatch, make_settings, messages, expected_loads):
+    settings = make_settings()
+    settings.storage_state_path.write_text("{}")
 
-        result = await controller.chat(prompt)
+    page = DummyPage()
+    page.locator_counts = {PROMPT_INPUT_SELECTOR: 1, MESSAGE_SELECTOR_UNION: messages}
+    manager, *_ = build_playwright_stack(page)
 
-        assert result == "raw answer"
-        send_mock.assert_called_once_with(page, decorated)
-        read_mock.assert_called_once_with(page, exclude_text=decorated, normalise=False)
+    monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
+    monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
+    monkeypatch.setattr(CopilotController, "_check_if_logged_in", _stub_logged_in)
+    monkeypatch.setattr(copilot_module, "prepare_chat_ui", AsyncMock())
+    monkeypatch.setattr(copilot_module, "_send_prompt", AsyncMock())
+    monkeypatch.setattr(copilot_module, "_read_response_text", AsyncMock(return_value="ok"))
 
-        await controller.close()
+    controller = CopilotController()
+    await controller.start()
 
-    asyncio.run(run())
+    assert await controller.chat("hi") == "ok"
+    assert page.goto_urls == [settings.copilot_url] * expected_loads
 
+    await controller.close()
 
-def test_ask_with_file_uploads_before_prompt(monkeypatch, make_settings, tmp_path):
-    async def run():
-        settings = make_settings()
-        settings.storage_state_path.write_text("{}")
 
-        page = DummyPage()
-        manager, browser, context, _, _ = build_playwright_stack(page)
+@pytest.mark.parametrize(
+    ("force_markdown", "normalise", "suffix"),
+    [
+        (False, True, ""),
+        (True, True, f"\n\n{MARKDOWN_INSTRUCTION}"),
+        (True, False, f"\n\n{MARKDOWN_INSTRUCTION}"),
+    ],
+    ids=["plain", "markdown-instruction", "raw-response"],
+)
+@on_module_loop
+async def test_chat_sends_prompt_and_returns_response(
+    monkeypatch, make_settings, force_markdown, normalise, suffix
+):
+    settings = make_settings(force_markdown_responses=force_markdown, normalize_markdown=normalise)
+    settings.storage_state_path.write_text("{}")
+
+    page = DummyPage()
+    manager, *_ = build_playwright_stack(page)
+
+    perform_login_mock = AsyncMock()
+    prepare_mock = AsyncMock()
+    send_mock = AsyncMock()
+    read_mock = AsyncMock(return_value="generated answer")
 
-        perform_login_mock = AsyncSpy()
-        prepare_mock = AsyncSpy()
-        upload_mock = AsyncSpy()
-        send_mock = AsyncSpy()
-        read_mock = AsyncSpy(return_value="analysis")
+    monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
+    monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
+    monkeypatch.setattr(copilot_module, "perform_login", perform_login_mock)
+    monkeypatch.setattr(copilot_module, "prepare_chat_ui", prepare_mock)
+    monkeypatch.setattr(copilot_module, "_send_prompt", send_mock)
+    monkeypatch.setattr(copilot_module, "_read_response_text", read_mock)
+    monkeypatch.setattr(CopilotController, "_check_if_logged_in", _stub_logged_in)
 
-        monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
-        monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
-        monkeypatch.setattr(copilot_module, "perform_login", perform_login_mock)
-        monkeypatch.setattr(copilot_module, "prepare_chat_ui", prepare_mock)
-        monkeypatch.setattr(copilot_module, "_upload_file", upload_mock)
-        monkeypatch.setattr(copilot_module, "_send_prompt", send_mock)
-        monkeypatch.setattr(copilot_module, "_read_response_text", read_mock)
-        monkeypatch.setattr(CopilotController, "_check_if_logged_in", _stub_logged_in)
+    controller = CopilotController()
+    await controller.start()
 
-        controller = CopilotController()
-        await controller.start()
+    prompt = "Summarise the quarterly report"
+    sent = f"{prompt}{suffix}"
+    result = await controller.chat(prompt)
+
+    assert result == "generated answer"
+    prepare_mock.assert_awaited_once_with(page)
+    send_mock.assert_awaited_once_with(page, sent)
+    read_mock.assert_awaited_once_with(page, exclude_text=sent, normalise=normalise)
+    perform_login_mock.assert_not_awaited()
+
+    await controller.close()
 
-        file_path = tmp_path / "report.pdf"
-        file_path.write_text("dummy content")
-        prompt = "Analyse the attached report"
 
-        result = await controller.ask_with_file(file_path, prompt)
+@on_module_loop
+async def test_ask_with_file_uploads_before_prompt(monkeypatch, make_settings, tmp_path):
+    settings = make_settings()
+    settings.storage_state_path.write_text("{}")
 
-        assert result == "analysis"
-        prepare_mock.assert_called_once_with(page)
-        upload_mock.assert_called_once_with(page, file_path)
-        send_mock.assert_called_once_with(page, prompt)
-        read_mock.assert_called_once_with(
-            page, exclude_text=prompt, normalise=settings.normalize_markdown
-        )
-        perform_login_mock.assert_not_called()
+    page = DummyPage()
+    manager, browser, context, _, _ = build_playwright_stack(page)
 
-        await controller.close()
+    perform_login_mock = AsyncMock()
+    prepare_mock = AsyncMock()
+    upload_mock = AsyncMock()
+    send_mock = AsyncMock()
+    read_mock = AsyncMock(return_value="analysis")
 
-    asyncio.run(run())
+    monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
+    monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
+    monkeypatch.setattr(copilot_module, "perform_login", perform_login_mock)
+    monkeypatch.setattr(copilot_module, "prepare_chat_ui", prepare_mock)
+    monkeypatch.setattr(copilot_module, "_upload_file", upload_mock)
+    monkeypatch.setattr(copilot_module, "_send_prompt", send_mock)
+    monkeypatch.setattr(copilot_module, "_read_response_text", read_mock)
+    monkeypatch.setattr(CopilotController, "_check_if_logged_in", _stub_logged_in)
 
+    controller = CopilotController()
+    await controller.start()
 
-def test_download_response_returns_path(monkeypatch, make_settings, tmp_path):
-    async def run():
-        settings = make_settings()
+    file_path = tmp_path / "report.pdf"
+    file_path.write_text("dummy content")
+    prompt = "Analyse the attached report"
 
-        page = DummyPage()
-        manager, browser, context, _, _ = build_playwright_stack(page)
+    result = await controller.ask_with_file(file_path, prompt)
 
-        download_mock = AsyncSpy(return_value=tmp_path / "copilot-result.txt")
+    assert result == "analysis"
+    prepare_mock.assert_awaited_once_with(page)
+    upload_mock.assert_awaited_once_with(page, file_path)
+    send_mock.assert_awaited_once_with(page, prompt)
+    read_mock.assert_awaited_once_with(
+        page, exclude_text=prompt, normalise=settings.normalize_markdown
+    )
+    perform_login_mock.assert_not_awaited()
+
+    await controller.close()
+
+
+@on_module_loop
+async def test_ask_with_file_uploads_after_ui_cleanup(monkeypatch, make_settings, tmp_path):
+    settings = make_settings()
+    settings.storage_state_path.write_text("{}")
 
-        monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
-        monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
-        monkeypatch.setattr(copilot_module, "_download_next", download_mock)
+    page = DummyPage()
+    manager, *_ = build_playwright_stack(page)
+    calls = []
+
+    async def _prepare(_page):
+        calls.append("prepare")
+
+    async def _upload(_page, _path):
+        calls.append("upload")
 
-        controller = CopilotController()
-        await controller.start()
+    monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
+    monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
+    monkeypatch.setattr(copilot_module, "prepare_chat_ui", _prepare)
+    monkeypatch.setattr(copilot_module, "_upload_file", _upload)
+    monkeypatch.setattr(copilot_module, "_send_prompt", AsyncMock())
+    monkeypatch.setattr(copilot_module, "_read_response_text", AsyncMock(return_value="done"))
+    monkeypatch.setattr(CopilotController, "_check_if_logged_in", _stub_logged_in)
 
-        target_dir = tmp_path / "downloads"
-        result_path = await controller.download_response(target_dir, timeout_ms=12345)
+    controller = CopilotController()
+    await controller.start()
 
-        assert result_path == tmp_path / "copilot-result.txt"
-        download_mock.assert_called_once_with(page, target_dir, timeout_ms=12345)
+    file_path = tmp_path / "report.pdf"
+    file_path.write_text("dummy content")
 
-        await controller.close()
+    assert await controller.ask_with_file(file_path, "Summarise") == "done"
+    assert calls == ["prepare", "upload"]
 
-    asyncio.run(run())
+    await controller.close()
 
 
-def test_chat_splits_long_prompt_and_instructs_order(monkeypatch, make_settings):
-    async def run():
-        # Configure small max to force splitting 12000-char prompt into 2 parts
-        settings = make_settings(force_markdown_responses=False)
-        settings.storage_state_path.write_text("{}")
-        # Use 10000 as max per user requirement constant
-        settings.max_prompt_chars = 10000
+@on_module_loop
+async def test_download_response_returns_path(monkeypatch, make_settings, tmp_path):
+    settings = make_settings()
 
-        page = DummyPage()
-        manager, browser, context, _, _ = build_playwright_stack(page)
+    page = DummyPage()
+    manager, browser, context, _, _ = build_playwright_stack(page)
 
-        prepare_mock = AsyncSpy()
-        send_mock = AsyncSpy()
-        read_mock = AsyncSpy(return_value="ok")
+    download_mock = AsyncMock(return_value=tmp_path / "copilot-result.txt")
 
-        monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
-        monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
-        monkeypatch.setattr(copilot_module, "prepare_chat_ui", prepare_mock)
-        monkeypatch.setattr(copilot_module, "_send_prompt", send_mock)
-        monkeypatch.setattr(copilot_module, "_read_response_text", read_mock)
-        monkeypatch.setattr(CopilotController, "_check_if_logged_in", _stub_logged_in)
+    monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
+    monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
+    monkeypatch.setattr(copilot_module, "_download_next", download_mock)
 
-        controller = CopilotController()
-        await controller.start()
+    controller = CopilotController()
+    await controller.start()
+
+    target_dir = tmp_path / "downloads"
+    result_path = await controller.download_response(target_dir, timeout_ms=12345)
+
+    assert result_path == tmp_path / "copilot-result.txt"
+    download_mock.assert_awaited_once_with(page, target_dir, timeout_ms=12345)
+
+    await controller.close()
+
+
+@on_module_loop
+async def test_chat_splits_long_prompt_and_instructs_order(monkeypatch, make_settings):
+    # Configure small max to force splitting 12000-char prompt into 2 parts
+    settings = make_settings(force_markdown_responses=False)
+    settings.storage_state_path.write_text("{}")
+    # Use 10000 as max per user requirement constant
+    settings.max_prompt_chars = 10000
+
+    page = DummyPage()
+    manager, browser, context, _, _ = build_playwright_stack(page)
+
+    prepare_mock = AsyncMock()
+    send_mock = AsyncMock()
+    read_mock = AsyncMock(return_value="ok")
+
+    monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
+    monkeypatch.setattr(copilot_module, "async_playwright", lambda: manager)
+    monkeypatch.setattr(copilot_module, "prepare_chat_ui", prepare_mock)
+    monkeypatch.setattr(copilot_module, "_send_prompt", send_mock)
+    monkeypatch.setattr(copilot_module, "_read_response_text", read_mock)
+    monkeypatch.setattr(CopilotController, "_check_if_logged_in", _stub_logged_in)
+
+    controller = CopilotController()
+    await controller.start()
+
+    long_prompt = "A" * 12000
+    result = await controller.chat(long_prompt)
+
+    assert result == "ok"
+    # Expect two sends with 1/2 and 2/2 markers
+    assert send_mock.await_count == 2
+    first_args, second_args = (call.args for call in send_mock.await_args_list)
+    assert "[Part 1/2]" in first_args[1]
+    assert "Do not respond yet" in first_args[1]
+    assert "[Part 2/2 - Final]" in second_args[1]
+    assert "Now process all parts above as a single prompt." in second_args[1]
+    # read should exclude the last message
+    read_mock.assert_awaited_once()
+    assert read_mock.await_args.kwargs.get("exclude_text") == second_args[1]
+
+    await controller.close()
+
+
+class _ProbePage:
+    def __init__(self, visible: set[str]) -> None:
+        self.visible = visible
+        self.probed: list[str] = []
+
+    async def is_visible(self, selector: str, timeout: int = 0) -> bool:
+        self.probed.append(selector)
+        return selector in self.visible
+
+    def get_by_role(self, role: str, name=None):
+        page = self
+
+        class _RoleLocator:
+            async def is_visible(self, timeout: int = 0) -> bool:
+                return f"{role}:{name.pattern}" in page.visible
+
+        return _RoleLocator()
+
+
+@pytest.mark.parametrize(
+    ("visible", "expected"),
+    [
+        ({LOGGED_IN_INDICATORS[-1]}, True),
+        ({LOGGED_IN_INDICATORS[0], SIGN_IN_SELECTORS[-1]}, False),
+        ({"menuitem:sign in"}, False),
+    ],
+)
+@on_module_loop
+async def test_check_if_logged_in_probes_all_indicators(
+    monkeypatch, make_settings, visible, expected
+):
+    monkeypatch.setattr(copilot_module, "get_settings", make_settings)
+    page = _ProbePage(visible)
+
+    result = await CopilotController()._check_if_logged_in(page)
+
+    assert result is expected
+    assert set(page.probed) == {*SIGN_IN_SELECTORS, *LOGGED_IN_INDICATORS}
+
+
+class _NewChatPage(DummyPage):
+    __slots__ = ("clicked", "new_chat_available")
+
+    def __init__(self, new_chat_available: bool) -> None:
+        super().__init__()
+        self.clicked: list[str] = []
+        self.new_chat_available = new_chat_available
+
+    def locator(self, selector: str):
+        page = self
+
+        class _Locator:
+            first = None
+
+            async def click(self, timeout: int = 0) -> None:
+                if not page.new_chat_available:
+                    raise TimeoutError(selector)
+                page.clicked.append(selector)
+
+            async def wait_for(self, state: str, timeout: int = 0) -> None:
+                pass
+
+        locator = _Locator()
+        locator.first = locator
+        return locator
+
+
+@pytest.mark.parametrize(("available", "expected_loads"), [(True, 0), (False, 1)])
+@on_module_loop
+async def test_reset_conversation_prefers_new_chat_button(
+    monkeypatch, make_settings, available, expected_loads
+):
+    settings = make_settings()
+    monkeypatch.setattr(copilot_module, "get_settings", lambda: settings)
+    controller = CopilotController()
+    controller.page = page = _NewChatPage(available)
+
+    await controller.reset_conversation()
 
-        long_prompt = "A" * 12000
-        result = await controller.chat(long_prompt)
-
-        assert result == "ok"
-        # Expect two sends with 1/2 and 2/2 markers
-        assert len(send_mock.calls) == 2
-        first_args, _ = send_mock.calls[0]
-        second_args, _ = send_mock.calls[1]
-        assert "[Part 1/2]" in first_args[1]
-        assert "Do not respond yet" in first_args[1]
-        assert "[Part 2/2 - Final]" in second_args[1]
-        assert "Now process all parts above as a single prompt." in second_args[1]
-        # read should exclude the last message
-        assert len(read_mock.calls) == 1
-        _, read_kwargs = read_mock.calls[0]
-        assert read_kwargs.get("exclude_text") == second_args[1]
-
-        await controller.close()
-
-    asyncio.run(run())
+    assert page.clicked == ([NEW_CHAT_SELECTOR_UNION] if available else [])
+    assert page.goto_urls == [settings.copilot_url] * expected_loads
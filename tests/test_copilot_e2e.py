@@ -8,46 +8,52 @@ These tests exercise the real Copilot experience and therefore require:
 * Stable network access plus the ability to launch a headed browser if desired.
 
 They are marked with ``pytest.mark.copilot_e2e`` and skipped by default so that
-normal CI runs remain fast and deterministic.
+normal CI runs remain fast and deterministic. Run them in a single process
+(``-n 0``): every test shares one logged-in controller, and parallel workers
+would each sign in to the same account and race on the storage-state file.
 """
 
 from __future__ import annotations
 
+import contextlib
+import functools
 import os
-from pathlib import Path
-from textwrap import dedent
+from typing import TYPE_CHECKING, Final
 
 import pytest
 import pytest_asyncio
-from dotenv import load_dotenv
 
 from src.automation.copilot_controller import CopilotController
 from src.utils.config import get_settings
 
-load_dotenv(dotenv_path=Path(".env"), override=False)
+if TYPE_CHECKING:
+    from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# src.utils.config has already loaded .env into os.environ on import
 
 _raw_flag = os.getenv("M365_COPILOT_E2E", "")
 LIVE_FLAG = _raw_flag.lower() in {"1", "true", "yes", "on"}
 
+_SAMPLE_REPORT: Final = (
+    b"This is a synthetic report for Copilot QA.\n"
+    b"Highlight three observations and summarise in 2 sentences."
+)
+
 
-def _require_live_env():
+@functools.lru_cache(maxsize=1)
+def _require_live_env() -> tuple[str, ...]:
+    """Return the credential variables still missing, probing env and disk once per process."""
     settings = get_settings()
-    env_username = os.getenv("M365_USERNAME") or settings.username
-    env_password = os.getenv("M365_PASSWORD") or settings.password
-    storage_ready = settings.storage_state_path.exists()
-    if env_username and not settings.username:
-        settings.username = env_username
-    if env_password and not settings.password:
-        settings.password = env_password
-    missing = []
-    if not env_username and not storage_ready:
-        missing.append("M365_USERNAME")
-    if not env_password and not storage_ready:
-        missing.append("M365_PASSWORD")
-    if storage_ready and missing:
-        missing = []
-    return missing
+    settings.hydrate_from_keyring()
+    if settings.storage_state_path.exists():
+        return ()
+    credentials = (("M365_USERNAME", settings.username), ("M365_PASSWORD", settings.password))
+    return tuple(name for name, value in credentials if not value)
 
 
 skip_live = pytest.mark.skipif(
@@ -59,7 +65,25 @@ skip_live = pytest.mark.skipif(
 )
 
 
-@pytest_asyncio.fixture(scope="module")
+# One controller (and Chromium instance) serves every live test in the session
+on_session_loop = pytest.mark.asyncio(loop_scope="session")
+
+
+@contextlib.contextmanager
+def _storage_state_lock(path: Path):
+    """Serialise login across concurrent test runs sharing ``path``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.with_name(f"{path.name}.lock").open("w") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def live_controller():
     missing = _require_live_env()
     if missing:
@@ -69,22 +93,36 @@ async def live_controller():
         )
         pytest.skip("Missing required credentials: " + ", ".join(missing) + ". " + hint)
 
+    # The lock covers start() too, so a concurrent run never loads a state
+    # file mid-write.
     controller = CopilotController()
+    settings = controller.settings
     try:
-        try:
-            await controller.start()
-        except Exception as exc:  # pragma: no cover - launch issues (missing browser?)
-            await controller.close()
-            pytest.skip(f"Playwright failed to launch Chromium: {exc}")
-        await controller.ensure_authenticated()
+        with _storage_state_lock(settings.storage_state_path):
+            try:
+                await controller.start()
+            except Exception as exc:  # pragma: no cover - launch issues (missing browser?)
+                # The outer finally closes whatever start() managed to open
+                pytest.skip(f"Playwright failed to launch Chromium: {exc}")
+            await controller.ensure_authenticated()
+            # Persist refreshed cookies so the next session skips the SSO login
+            assert controller.context
+            await controller.context.storage_state(path=str(settings.storage_state_path))
         yield controller
     finally:
         await controller.close()
 
 
+@pytest_asyncio.fixture(loop_scope="session", autouse=True)
+async def fresh_conversation(live_controller: CopilotController):
+    """Start each live test in a new conversation on the already-loaded page."""
+    yield
+    await live_controller.reset_conversation()
+
+
 @skip_live
 @pytest.mark.copilot_e2e
-@pytest.mark.asyncio
+@on_session_loop
 async def test_copilot_chat_returns_content(live_controller: CopilotController):
     prompt = "Respond with a short friendly greeting for the Copilot smoke test."
     response = await live_controller.chat(prompt)
@@ -95,29 +133,17 @@ async def test_copilot_chat_returns_content(live_controller: CopilotController):
 
 @skip_live
 @pytest.mark.copilot_e2e
-@pytest.mark.asyncio
-async def test_copilot_ask_with_file_reads_attachment(
-    live_controller: CopilotController, tmp_path: Path
-):
-    sample = tmp_path / "sample.txt"
-    sample.write_text(
-        dedent(
-            """
-            This is a synthetic report for Copilot QA.
-            Highlight three observations and summarise in 2 sentences.
-            """
-        ).strip()
-    )
-
+@on_session_loop
+async def test_copilot_ask_with_file_reads_attachment(live_controller: CopilotController):
     prompt = "Summarise the attached report in two sentences."
-    response = await live_controller.ask_with_file(sample, prompt)
+    response = await live_controller.ask_with_file(("sample.txt", _SAMPLE_REPORT), prompt)
 
     assert response.strip(), "File-based response should not be empty"
 
 
 @skip_live
 @pytest.mark.copilot_e2e
-@pytest.mark.asyncio
+@on_session_loop
 async def test_copilot_can_provide_downloadable_artifact(
     live_controller: CopilotController, tmp_path: Path
 ):
@@ -1,58 +1,85 @@
+import asyncio
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import pytest
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from src.automation import files
-from src.exceptions import DownloadTimeoutError
+from src.exceptions import DownloadTimeoutError, FileValidationError
 
+_DOWNLOAD_BYTES = b"dummy"
 
+
+@dataclass(slots=True)
 class _DummyDownload:
-    def __init__(self, suggested="copilot.md") -> None:
-        self.suggested_filename = suggested
-        self.saved_to: Path | None = None
+    suggested_filename: str = "copilot.md"
+    source: Path | None = None
+    saved_to: Path | None = None
+
+    async def path(self):
+        return self.source
 
     async def save_as(self, destination: str) -> None:
         path = Path(destination)
-        path.write_text("dummy")
+        await asyncio.to_thread(path.write_bytes, _DOWNLOAD_BYTES)
         self.saved_to = path
 
 
 class _DummyDownloadInfo:
     def __init__(self, download: _DummyDownload) -> None:
-        self._download = download
+        self.download = download
+        self.value: asyncio.Future[_DummyDownload] | None = None
 
     async def __aenter__(self):
+        # Like Playwright's EventContextManager, ``value`` is an awaitable future
+        self.value = asyncio.get_running_loop().create_future()
+        self.value.set_result(self.download)
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
         return False
 
+
+class _DummyTrigger:
+    """Locator over ``(selector, visible)`` matches, kept in page order."""
+
+    def __init__(self, page: "_DummyPage", matches: list[tuple[str, bool]]) -> None:
+        self._page = page
+        self._matches = matches
+
+    def or_(self, other: "_DummyTrigger"):
+        return _DummyTrigger(self._page, self._matches + other._matches)
+
     @property
-    def value(self):
-        async def _inner():
-            return self._download
+    def first(self):
+        return _DummyTrigger(self._page, self._matches[:1])
 
-        return _inner()
+    async def click(self, timeout: int = 0):
+        if not self._matches or not self._matches[0][1]:
+            raise PlaywrightTimeoutError("no clickable trigger")
+        self._page.clicks.append(self._matches[0][0])
 
 
+@dataclass(slots=True)
 class _DummyPage:
-    def __init__(self, download: _DummyDownload, visible=True, timeout=False) -> None:
-        self._download = download
-        self._visible = visible
-        self.clicks: list[str] = []
-        self._timeout = timeout
-
-    async def is_visible(self, selector: str, timeout: int = 0):
-        return self._visible
+    download: _DummyDownload
+    # Visibility of the elements each download selector matches
+    buttons: dict[str, list[bool]] = field(default_factory=lambda: {"a[download]": [True]})
+    timeout: bool = False
+    clicks: list[str] = field(default_factory=list)
 
-    async def click(self, selector: str):
-        self.clicks.append(selector)
+    def locator(self, selector: str):
+        base, _, engine = selector.partition(" >> ")
+        matches = [(sel, shown) for sel in base.split(", ") for shown in self.buttons.get(sel, ())]
+        if engine == "visible=true":
+            matches = [match for match in matches if match[1]]
+        return _DummyTrigger(self, matches)
 
     def expect_download(self, timeout: int = 0):
-        if self._timeout:
+        if self.timeout:
             raise PlaywrightTimeoutError("no download")
-        return _DummyDownloadInfo(self._download)
+        return _DummyDownloadInfo(self.download)
 
 
 @pytest.mark.asyncio
@@ -66,7 +93,44 @@ async def test_download_next_saves_file(tmp_path):
     assert result == target / "report.md"
     assert download.saved_to == result
     assert result.exists()
-    assert page.clicks, "Should click one of the download triggers"
+    assert page.clicks == ["a[download]"]
+
+
+@pytest.mark.asyncio
+async def test_download_next_skips_hidden_trigger_for_visible_one(tmp_path):
+    download = _DummyDownload("report.md")
+    page = _DummyPage(
+        download, buttons={"a[download]": [False], 'button[aria-label="Download"]': [True]}
+    )
+
+    await files.download_next(page, tmp_path)
+
+    assert page.clicks == ['button[aria-label="Download"]']
+
+
+@pytest.mark.asyncio
+async def test_download_next_waits_for_automatic_download(tmp_path):
+    download = _DummyDownload("auto.md")
+    page = _DummyPage(download, buttons={"a[download]": [False]})
+
+    result = await files.download_next(page, tmp_path)
+
+    assert result == tmp_path / "auto.md"
+    assert page.clicks == []
+
+
+@pytest.mark.asyncio
+async def test_download_next_moves_temp_file_on_same_filesystem(tmp_path):
+    source = tmp_path / "playwright-temp"
+    source.write_text("exported")
+    download = _DummyDownload("export.md", source=source)
+    page = _DummyPage(download)
+
+    result = await files.download_next(page, tmp_path / "artifacts")
+
+    assert result.read_text() == "exported"
+    assert not source.exists()
+    assert download.saved_to is None
 
 
 @pytest.mark.asyncio
@@ -79,3 +143,129 @@ async def test_download_next_times_out(tmp_path):
         await files.download_next(page, target, timeout_ms=100)
 
     assert "Timed out" in str(exc.value)
+
+
+@pytest.mark.asyncio
+async def test_click_with_retry_fails_fast_on_programming_errors():
+    calls = []
+
+    class _BrokenPage:
+        def get_by_test_id(self, test_id: str):
+            calls.append(test_id)
+            raise AttributeError("no such locator")
+
+    with pytest.raises(AttributeError):
+        await files._click_with_retry(_BrokenPage(), "plus-button", "+ button")
+
+    assert calls == ["plus-button"]
+
+
+class _FileInputLocator:
+    def __init__(self, count: int) -> None:
+        self._count = count
+        self.files: list[str] = []
+
+    @property
+    def first(self):
+        return self
+
+    async def count(self) -> int:
+        return self._count
+
+    async def set_input_files(self, files, timeout: int = 0) -> None:
+        self.files.append(files)
+
+
+class _AttachmentChip:
+    def __init__(self) -> None:
+        self.waits: list[int] = []
+
+    @property
+    def first(self):
+        return self
+
+    async def wait_for(self, state: str, timeout: int = 0) -> None:
+        self.waits.append(timeout)
+
+
+class _UploadPage:
+    def __init__(self, inputs: int) -> None:
+        self.file_input = _FileInputLocator(inputs)
+        self.chip = _AttachmentChip()
+
+    def locator(self, selector: str):
+        if selector == files.ATTACHMENT_CHIP_SELECTOR_UNION:
+            return self.chip
+        assert selector == files.FILE_INPUT_SELECTOR
+        return self.file_input
+
+
+@pytest.mark.asyncio
+async def test_upload_file_uses_existing_file_input(tmp_path, monkeypatch):
+    document = tmp_path / "notes.txt"
+    document.write_text("hello")
+    page = _UploadPage(inputs=1)
+
+    async def _unexpected(*_args, **_kwargs):
+        raise AssertionError("file chooser flow should be skipped")
+
+    monkeypatch.setattr(files, "_upload_via_file_chooser", _unexpected)
+
+    await files.upload_file(page, document)
+
+    assert page.file_input.files == [str(document)]
+    assert page.chip.waits == [files.FILE_ATTACHMENT_MS]
+
+
+@pytest.mark.asyncio
+async def test_upload_file_falls_back_to_file_chooser(tmp_path, monkeypatch):
+    document = tmp_path / "notes.txt"
+    document.write_text("hello")
+    page = _UploadPage(inputs=0)
+    fallback_calls = []
+
+    async def _fallback(p, path):
+        fallback_calls.append((p, path))
+
+    monkeypatch.setattr(files, "_upload_via_file_chooser", _fallback)
+
+    await files.upload_file(page, document)
+
+    assert fallback_calls == [(page, str(document))]
+    assert page.file_input.files == []
+
+
+@pytest.mark.asyncio
+async def test_upload_file_sends_in_memory_payload():
+    page = _UploadPage(inputs=1)
+
+    await files.upload_file(page, ("notes.txt", b"hello"))
+
+    assert page.file_input.files == [
+        {"name": "notes.txt", "mimeType": "text/plain", "buffer": b"hello"}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_upload_file_validates_in_memory_payload():
+    page = _UploadPage(inputs=1)
+
+    with pytest.raises(FileValidationError, match="not allowed"):
+        await files.upload_file(page, ("script.exe", b"MZ"))
+    assert page.file_input.files == []
+
+
+@pytest.mark.parametrize(
+    ("name", "message"),
+    [
+        ("missing.txt", "does not exist"),
+        ("folder", "not a file"),
+        ("script.exe", "not allowed"),
+    ],
+)
+def test_validate_file_rejects_invalid_paths(tmp_path, name, message):
+    (tmp_path / "folder").mkdir()
+    (tmp_path / "script.exe").write_text("MZ")
+
+    with pytest.raises(FileValidationError, match=message):
+        files.validate_file(tmp_path / name)
@@ -0,0 +1,21 @@
+import logging
+
+from src.utils import logger as logger_module
+
+
+def test_module_loggers_inherit_root_handler_and_level():
+    root = logging.getLogger("src")
+    module_logger = logger_module.get_logger("src.automation.example")
+    previous = root.level
+
+    try:
+        logger_module.set_level("debug")
+        assert module_logger.handlers == []
+        assert module_logger.getEffectiveLevel() == logging.DEBUG
+        assert sum(type(h) is logging.StreamHandler for h in root.handlers) == 1
+    finally:
+        root.setLevel(previous)
+
+
+def test_foreign_names_are_nested_under_package_root():
+    assert logger_module.get_logger("scripts.tool").name == "src.scripts.tool"
@@ -0,0 +1,18 @@
+from src.utils import paths
+
+
+def test_ensure_dir_creates_missing_parents(tmp_path):
+    target = tmp_path / "nested" / "out"
+
+    assert paths.ensure_dir(target) == target
+    assert target.is_dir()
+
+
+def test_ensure_dir_recreates_deleted_directory(tmp_path):
+    target = tmp_path / "out"
+    paths.ensure_dir(target)
+    target.rmdir()
+
+    paths.ensure_dir(target)
+
+    assert target.is_dir()
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from src.automation.pool import BrowserContextPool
+
+
+class _Closable:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+
+def _factory(created: list):
+    async def factory():
+        context, page = _Closable(f"ctx{len(created)}"), _Closable(f"page{len(created)}")
+        created.append((context, page))
+        return context, page
+
+    return factory
+
+
+def test_acquire_reuses_released_session():
+    async def run():
+        created: list = []
+        pool = BrowserContextPool(_factory(created), max_size=2)
+
+        async with pool.acquire() as first:
+            pass
+        async with pool.acquire() as second:
+            pass
+
+        assert first is second
+        assert len(created) == 1
+        await pool.close()
+        assert created[0][0].closed
+
+    asyncio.run(run())
+
+
+def test_concurrent_acquire_opens_extra_contexts_up_to_max_size():
+    async def run():
+        created: list = []
+        pool = BrowserContextPool(_factory(created), max_size=2)
+        primary = (_Closable("primary"), _Closable("primary-page"))
+        pool.seed(*primary)
+        active = 0
+        peak = 0
+
+        async def use():
+            nonlocal active, peak
+            async with pool.acquire():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(use() for _ in range(5)))
+
+        assert peak == 2
+        assert len(created) == 1
+        await pool.close()
+        assert not primary[0].closed
+
+    asyncio.run(run())
+
+
+def test_reap_idle_closes_stale_owned_contexts_above_min_size():
+    async def run():
+        created: list = []
+        pool = BrowserContextPool(_factory(created), max_size=3, min_size=1, idle_timeout=0)
+
+        async def hold(event: asyncio.Event):
+            async with pool.acquire():
+                await event.wait()
+
+        event = asyncio.Event()
+        tasks = [asyncio.create_task(hold(event)) for _ in range(3)]
+        await asyncio.sleep(0)
+        event.set()
+        await asyncio.gather(*tasks)
+
+        assert await pool.reap_idle() == 2
+        assert sum(ctx.closed for ctx, _ in created) == 2
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_acquire_drops_session_after_failure_or_closed_page():
+    async def run():
+        created: list = []
+        pool = BrowserContextPool(_factory(created), max_size=2)
+
+        with pytest.raises(RuntimeError):
+            async with pool.acquire():
+                raise RuntimeError("page crashed")
+        async with pool.acquire() as page:
+            await page.close()
+        async with pool.acquire():
+            pass
+
+        assert len(created) == 3
+        assert created[0][0].closed
+        assert created[1][0].closed
+        assert not created[2][0].closed
+        await pool.close()
+
+    asyncio.run(run())
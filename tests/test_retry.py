@@ -0,0 +1,184 @@
+import asyncio
+import functools
+
+import pytest
+
+from src.utils import retry as retry_module
+from src.utils.retry import backoff_delay_ms, retry_async, wait_for_condition
+
+
+@pytest.mark.asyncio
+async def test_retry_async_caps_backoff_before_jitter(monkeypatch):
+    delays = []
+
+    async def _fake_sleep(seconds):
+        delays.append(seconds)
+
+    monkeypatch.setattr(retry_module.asyncio, "sleep", _fake_sleep)
+    monkeypatch.setattr(retry_module.random, "uniform", lambda a, b: b)
+    attempts = 0
+
+    async def _flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 4:
+            raise TimeoutError
+        return "ok"
+
+    result = await retry_async(_flaky, max_retries=4, delay_ms=1000, max_delay_ms=3000)
+
+    assert result == "ok"
+    assert delays == [1.0, 2.0, 3.0]
+
+
+def test_retry_async_without_jitter_is_deterministic(monkeypatch):
+    delays = []
+
+    async def _fake_sleep(seconds):
+        delays.append(seconds)
+
+    async def _always_fails():
+        raise ValueError("boom")
+
+    async def run():
+        monkeypatch.setattr(retry_module.asyncio, "sleep", _fake_sleep)
+        with pytest.raises(ValueError, match="boom"):
+            await retry_async(_always_fails, max_retries=3, delay_ms=100, jitter="none")
+
+    asyncio.run(run())
+    assert delays == [0.1, 0.2]
+
+
+@pytest.mark.parametrize(
+    ("jitter", "low", "high"),
+    [("full", 0, 4000), ("equal", 2000, 4000), ("none", 4000, 4000)],
+)
+def test_backoff_delay_ms_stays_within_jitter_window(jitter, low, high):
+    for _ in range(200):
+        delay = backoff_delay_ms(3, 1000, jitter=jitter, max_delay_ms=4000)
+        assert low <= delay <= high
+
+
+@pytest.mark.asyncio
+async def test_retry_async_fails_fast_when_backoff_would_pass_timeout(monkeypatch):
+    delays = []
+
+    async def _fake_sleep(seconds):
+        delays.append(seconds)
+
+    monkeypatch.setattr(retry_module.asyncio, "sleep", _fake_sleep)
+    monkeypatch.setattr(retry_module.time, "monotonic", lambda: 10.0)
+    calls = 0
+
+    async def _always_fails():
+        nonlocal calls
+        calls += 1
+        raise TimeoutError
+
+    with pytest.raises(TimeoutError):
+        await retry_async(
+            _always_fails, max_retries=5, delay_ms=100, jitter="none", total_timeout_ms=150
+        )
+
+    assert calls == 2
+    assert delays == [0.1]
+
+
+@pytest.mark.asyncio
+async def test_wait_for_condition_polls_with_doubling_interval(monkeypatch):
+    delays = []
+
+    async def _fake_sleep(seconds):
+        delays.append(round(seconds * 1000))
+
+    monkeypatch.setattr(retry_module.asyncio, "sleep", _fake_sleep)
+
+    with pytest.raises(TimeoutError, match="never"):
+        await wait_for_condition(
+            lambda: False, timeout_ms=200, poll_interval_ms=40, error_message="never"
+        )
+
+    assert delays == [5, 10, 20, 40, 40, 40, 40, 40]
+
+
+@pytest.mark.asyncio
+async def test_wait_for_condition_inspects_condition_once(monkeypatch):
+    checks = []
+    original = retry_module.inspect.iscoroutinefunction
+    monkeypatch.setattr(
+        retry_module.inspect,
+        "iscoroutinefunction",
+        lambda fn: checks.append(fn) or original(fn),
+    )
+    polls = 0
+
+    async def _ready_on_third_poll():
+        nonlocal polls
+        polls += 1
+        return polls == 3
+
+    await wait_for_condition(_ready_on_third_poll, timeout_ms=1000, poll_interval_ms=1)
+
+    assert polls == 3
+    assert checks == [_ready_on_third_poll]
+
+
+@pytest.mark.asyncio
+async def test_retry_async_logs_partials_without_a_name(monkeypatch, caplog):
+    async def _fake_sleep(seconds):
+        return None
+
+    async def _fails(reason):
+        raise ValueError(reason)
+
+    monkeypatch.setattr(retry_module.asyncio, "sleep", _fake_sleep)
+
+    with pytest.raises(ValueError, match="boom"):
+        await retry_async(functools.partial(_fails, "boom"), max_retries=2, jitter="none")
+
+    assert "All 2 retry attempts failed for functools.partial" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_retry_on_exception_reports_the_decorated_name(caplog):
+    @retry_module.retry_on_exception(max_retries=1)
+    async def click_button():
+        raise TimeoutError
+
+    with pytest.raises(TimeoutError):
+        await click_button()
+
+    assert "failed for click_button" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_retry_on_exception_stops_when_total_timeout_is_spent(monkeypatch):
+    clock = [100.0]
+
+    async def _fake_sleep(seconds):
+        clock[0] += seconds
+
+    monkeypatch.setattr(retry_module.asyncio, "sleep", _fake_sleep)
+    monkeypatch.setattr(retry_module.time, "monotonic", lambda: clock[0])
+    calls = 0
+
+    @retry_module.retry_on_exception(
+        max_retries=8, delay_ms=1000, jitter="none", total_timeout_ms=5000
+    )
+    async def _always_times_out():
+        nonlocal calls
+        calls += 1
+        raise TimeoutError
+
+    with pytest.raises(TimeoutError):
+        await _always_times_out()
+
+    # 1s + 2s of backoff fit the 5s budget; the next 4s sleep would not
+    assert calls == 3
+    assert clock[0] == pytest.approx(103.0)
+
+
+def test_backoff_delay_ms_caps_huge_attempt_counts():
+    assert backoff_delay_ms(10_000, 1000, jitter="none", max_delay_ms=30_000) == 30_000
+    assert backoff_delay_ms(2, 1000, jitter="none", max_delay_ms=30_000) == 4000
+    assert backoff_delay_ms(2, 1000, exponential_backoff=False, jitter="none") == 1000